@@ -24,6 +24,9 @@ setup(
     license='MIT',
     packages=['spaghetti'],
     install_requires=['networkx', 'matplotlib'],
+    extras_require={
+        'matrix': ['numpy', 'scipy'],
+    },
     entry_points={
         'console_scripts': ['spaghetti=spaghetti.command_line:main',
                             'spaghetti-graph=spaghetti.command_line:main'
@@ -0,0 +1,80 @@
+import fnmatch
+import os
+
+
+# Methods that run before or after every test in their class
+FIXTURES = {"setUp", "tearDown", "setUpClass", "tearDownClass", "asyncSetUp", "asyncTearDown", "setup_method",
+            "teardown_method", "setup_class", "teardown_class"}
+TEST_FILE_PATTERNS = ["test_*.py", "*_test.py", "*_tests.py"]
+
+
+# Returns true if the file holds tests, either because it is in a tests directory below root or because of its name
+def is_test_file(path, root=None):
+    if root is not None:
+        path = os.path.relpath(path, root)
+    directories = os.path.dirname(path).split(os.sep)
+    if "tests" in directories or "test" in directories:
+        return True
+    return any(fnmatch.fnmatch(os.path.basename(path), pattern) for pattern in TEST_FILE_PATTERNS)
+
+
+def is_test(node, root=None):
+    return node.is_secondary() is False and node.get_name().startswith("test") and is_test_file(node.get_path(), root)
+
+
+# Returns the directory that tests directories are looked for below: the current working directory if the whole
+# search area is in it, and otherwise the directory the search area is in. Directories above it, such as those of
+# a checkout under a tests directory, do not make every file a test file.
+def get_root(search):
+    cwd = os.getcwd()
+    paths = [os.path.abspath(os.path.expanduser(name)) for name in search.filenames]
+    if all(os.path.commonpath([cwd, path]) == cwd for path in paths):
+        return cwd
+    root = os.path.commonpath(paths)
+    if os.path.isfile(root):
+        return os.path.dirname(root)
+    return root
+
+
+# Returns the test functions that call a function in one of the changed files, directly or through other functions,
+# sorted by file, class and name
+def find_affected_tests(search, changed_files):
+    reached = set()
+    stack = []
+    for file in changed_files:
+        for node in search.file_index.get(os.path.abspath(file), ()):
+            if node not in reached:
+                reached.add(node)
+                stack.append(node)
+
+    root = get_root(search)
+    tests = set()
+    while len(stack) != 0:
+        node = stack.pop()
+        if is_test(node, root):
+            tests.add(node)
+        callers = list(node.get_edges())
+        # Every test in a class depends on the fixtures of the class
+        if node.get_name() in FIXTURES and is_test_file(node.get_path(), root):
+            callers.extend(other for other in search.file_index.get(node.get_path(), ())
+                           if other.get_class() == node.get_class())
+        for caller in callers:
+            if caller not in reached:
+                reached.add(caller)
+                stack.append(caller)
+    return sorted(tests, key=lambda test: (test.get_path(), test.get_class(), test.get_name()))
+
+
+# Returns the identifier pytest or unittest uses to select the test, relative to the current working directory
+def get_test_id(node, style="pytest"):
+    path = os.path.relpath(node.get_path())
+    if style == "unittest":
+        parts = [os.path.splitext(path)[0].replace(os.sep, ".")]
+        separator = "."
+    else:
+        parts = [path]
+        separator = "::"
+    if node.get_class() != "":
+        parts.append(node.get_class())
+    parts.append(node.get_name())
+    return separator.join(parts)
@@ -1,4 +1,3 @@
-import importlib
 import ast
 import os
 import builtins
@@ -43,13 +42,21 @@ class ASTParser(ast.NodeVisitor):
 
     # Adds the given node to the graph if it is not already in it
     def add_node(self, node):
-        if node not in self.search.graph:
-            self.search.graph[node] = node
+        self.search.add_node(node)
 
 
 # Searches AST for nodes and adds them to the graph
 class NodeCreator(ASTParser):
 
+    def __init__(self, search, filename="", recursive=0):
+        super().__init__(search, filename, recursive)
+        # The nodes and imports found in the file in order
+        self.found = []
+
+    def add_node(self, node):
+        self.found.append(node)
+        super().add_node(node)
+
     # Ensures that imported code is graphed as well
     def visit_Import(self, node):
         if self.recursive < 1:
@@ -67,19 +74,32 @@ class NodeCreator(ASTParser):
                     folder += folders[x] + "."
                 x += 1
             imported_name = folder + reference.name
-            imported = importlib.import_module(imported_name)
-            visitor = NodeCreator(search=self.search, filename=imported.__file__, recursive=self.recursive+1)
-            tree_file = open(imported.__file__)
-            tree = ast.parse(tree_file.read())
+            # The nodes of modules that were already crawled are in the graph, or in the graph of the search being updated
+            if imported_name in self.search.crawled_imports or self.search.copy_module(imported_name) is True:
+                self.found.append(("import", imported_name))
+                return
+            imported_file = self.search.cache.find_module(imported_name)
+            reason = self.search.budget.check_file(imported_file)
+            if reason is None:
+                digest, tree = self.search.cache.parse(imported_file)
+                reason = self.search.budget.check_tree(tree)
+            if reason is not None:
+                self.search.skipped[imported_file] = reason
+                return
+            visitor = NodeCreator(search=self.search, filename=imported_file, recursive=self.recursive+1)
             visitor.visit(tree)
             self.search.crawled_imports.add(imported_name)
+            self.search.module_nodes[imported_name] = visitor.found
+            self.found.append(("import", imported_name))
         except ImportError:
             if folder_index < len(folders):
                 self.crawl_import(node, reference, folders, folder_index+1)
             else:
                 self.search.uncrawled.add(reference.name)
-        except AttributeError:
+                self.found.append(("uncrawled", reference.name))
+        except (AttributeError, SyntaxError, ValueError):
             self.search.uncrawled.add(reference.name)
+            self.found.append(("uncrawled", reference.name))
 
     def visit_ClassDef(self, node):
         self.handle_node(node, "current_class", self.add_class_node)
@@ -105,6 +125,11 @@ class NodeCreator(ASTParser):
 # Detects connections in the AST and adds them as edges in the graph
 class EdgeDetector(ASTParser):
 
+    # With names only the calls to those names are added
+    def __init__(self, search, filename="", names=None):
+        super().__init__(search, filename)
+        self.names = names
+
     # Records actual function calls
     def visit_Call(self, node):
         # print(ast.dump(node))
@@ -112,7 +137,12 @@ class EdgeDetector(ASTParser):
         # Checks for information to reconstruct the fully qualified name of the node. Not enough data is in the AST
         # to always be able to find the right node.
         if "value" in dir(node.func):
-            dependency = node.func.attr
+            # Calls on subscripts and other expressions without a name can not be resolved
+            try:
+                dependency = node.func.attr
+            except AttributeError:
+                self.generic_visit(node)
+                return
             try:
                 home = node.func.value.id
             except AttributeError:
@@ -125,45 +155,42 @@ class EdgeDetector(ASTParser):
                 self.generic_visit(node)
                 return
 
+        if self.names is not None and dependency not in self.names:
+            self.generic_visit(node)
+            return
+
         dependency_node = None
         already_found = False
 
-        # Searches the graph and selects the node being referenced
-        for n in self.search.graph:
-            if n.get_name() == dependency or (n.get_name() == "__init__" and n.get_class() == dependency):
-                if already_found is True:
-                    # If there is a conflict and this is a more exact match save this
-                    if n.is_identifier(home) is True and dependency_node.is_identifier(home) is False:
-                        dependency_node = n
-                    # Do nothing if existing node is better.
-                    if n.is_identifier(home) is False and dependency_node.is_identifier(home) is True:
-                        pass
-                    # If neither or both match throw an error. This should not happen normally.
-                    else:
-                        self.search.unsure_nodes.add(self.current_filename + ":" + self.current_function + "(" +
-                                                     dependency + ")")
-                else:
+        # Looks up the nodes that could be referenced by this name and selects the best one
+        for n in self.search.index.get(dependency, ()):
+            if already_found is True:
+                # If there is a conflict and this is a more exact match save this
+                if n.is_identifier(home) is True and dependency_node.is_identifier(home) is False:
                     dependency_node = n
-                    already_found = True
-
-            if n.get_ast_node() == node:
-                this_node = n
+                # Do nothing if existing node is better.
+                if n.is_identifier(home) is False and dependency_node.is_identifier(home) is True:
+                    pass
+                # If neither or both match throw an error. This should not happen normally.
+                else:
+                    self.search.unsure_nodes.add(self.current_filename + ":" + self.current_function + "(" +
+                                                 dependency + ")")
+            else:
+                dependency_node = n
+                already_found = True
 
-        # Creates this node if it was not already in the graph
-        try:
-            this_node
-        except NameError:
-            if self.current_function == "":
-                self.current_function = "__main__"
+        if self.current_function == "":
+            self.current_function = "__main__"
 
-            this_node = FuncNode(filename=self.current_filename, class_name=self.current_class,
-                                 name=self.current_function, ast_node=node, mode=self.search.mode)
+        # Existing nodes in the graph are reused when this one is added because they share the same hash
+        this_node = FuncNode(filename=self.current_filename, class_name=self.current_class,
+                             name=self.current_function, ast_node=node, mode=self.search.mode)
 
-        self.add_edge(dependency, this_node, dependency_node,)
+        self.add_edge(dependency, this_node, dependency_node, line=node.lineno)
         self.generic_visit(node)
 
     # Adds an edge to the graph
-    def add_edge(self, dependency, this_node, dependency_node=None):
+    def add_edge(self, dependency, this_node, dependency_node=None, line=None):
         # Error handling if the node's identity could not be determined
         if dependency_node is None:
             if dependency in dir(builtins):  # sys.builtin_module_names
@@ -180,5 +207,9 @@ class EdgeDetector(ASTParser):
         self.add_node(dependency_node)
 
         # This works even if the node was not added to the graph because the existing node's hash would be the same.
-        self.search.graph[this_node].add_edge(dependency_node, dependency=True)
-        self.search.graph[dependency_node].add_edge(this_node, dependency=False)
+        # The nodes in the graph are used on both ends so that edges can be followed from either side.
+        this_node = self.search.graph[this_node]
+        dependency_node = self.search.graph[dependency_node]
+        self.search.invalidate()
+        this_node.add_edge(dependency_node, dependency=True, line=line)
+        dependency_node.add_edge(this_node, dependency=False)
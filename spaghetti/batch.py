@@ -0,0 +1,139 @@
+import concurrent.futures
+import json
+import os
+
+try:
+    from spaghetti.budget import Budget
+    from spaghetti.cache import ParseCache
+    from spaghetti.config import load_toml
+    from spaghetti.export import graph_to_dict, measurements_to_dict
+    from spaghetti.measurements import Measurements
+    from spaghetti.search import Search
+except ImportError:
+    from budget import Budget
+    from cache import ParseCache
+    from config import load_toml
+    from export import graph_to_dict, measurements_to_dict
+    from measurements import Measurements
+    from search import Search
+
+
+FORMATS = ["text", "json", "measurements"]
+
+# The parse cache shared by every project analysed in this process
+shared_cache = ParseCache()
+
+
+# Sets up a worker process
+def start_worker(max_trees=None):
+    global shared_cache
+    shared_cache = ParseCache(max_trees=max_trees)
+
+
+# Searches a single project and writes each of its outputs to a separate file. Returns the files written. The search
+# stops with a partial graph once the worker uses more than max_memory megabytes.
+def analyse_project(project, output, max_memory=None):
+    budget = Budget(time_budget=project.get("time_budget"), max_memory=max_memory,
+                    max_file_size=project.get("max_file_size"), max_ast_nodes=project.get("max_ast_nodes"))
+    # Trees cached for earlier projects are dropped rather than leaving no memory for this one
+    if budget.check_exhausted() is not None:
+        shared_cache.clear()
+    search = Search(filenames=project["paths"], inverse=project.get("inverse", False), cache=shared_cache,
+                    budget=budget)
+    base = os.path.join(output, project["name"])
+    written = []
+    if search.is_partial():
+        with open(base + ".skipped.json", "w") as json_file:
+            json.dump(search.skipped, json_file, indent=2, sort_keys=True)
+        written.append(base + ".skipped.json")
+    if "text" in project["formats"]:
+        with open(base + ".txt", "w") as text_file:
+            text_file.write(search.get_graph_str(indent="-40"))
+        written.append(base + ".txt")
+    if "json" in project["formats"]:
+        with open(base + ".json", "w") as json_file:
+            json.dump(graph_to_dict(search.get_graph()), json_file, indent=2)
+        written.append(base + ".json")
+    if "measurements" in project["formats"]:
+        measure = Measurements(search.get_nx_graph(), approx=project.get("approx", False),
+                               samples=project.get("samples", 200), time_budget=project.get("sample_time"))
+        with open(base + ".measurements.json", "w") as json_file:
+            json.dump(measurements_to_dict(measure), json_file, indent=2)
+        written.append(base + ".measurements.json")
+    return written
+
+
+# Returns true if the name of a project can be used as the name of its output files without leaving the output
+# directory
+def is_safe_name(name):
+    separators = [separator for separator in ["/", os.sep, os.altsep] if separator is not None]
+    return (isinstance(name, str) and name != "" and ".." not in name and
+            not any(separator in name for separator in separators))
+
+
+# Analyses many projects listed in a TOML manifest with a pool of worker processes. Workers analyse several projects
+# each so that parsed library modules and found imports are shared between them. For example:
+#
+# workers = 4
+# max_memory = 8192  # megabytes for the whole batch
+# output = "spaghetti-batch"
+#
+# [[project]]
+# name = "website"
+# paths = ["repos/website"]
+# formats = ["text", "json", "measurements"]
+#
+# Relative paths are relative to the directory of the manifest.
+class Batch:
+
+    def __init__(self, manifest, workers=None, max_memory=None):
+        config = load_toml(manifest)
+        root = os.path.dirname(os.path.abspath(manifest))
+
+        self.workers = workers if workers is not None else config.get("workers", os.cpu_count() or 1)
+        if not isinstance(self.workers, int) or isinstance(self.workers, bool) or self.workers < 1:
+            raise ValueError("workers must be a whole number of at least 1, not %r" % (self.workers,))
+        self.max_memory = max_memory if max_memory is not None else config.get("max_memory")
+        self.max_trees = config.get("max_cached_trees", 10000)
+        self.output = os.path.join(root, config.get("output", "spaghetti-batch"))
+
+        self.projects = []
+        names = set()
+        for project in config.get("project", []):
+            if "name" not in project or "paths" not in project:
+                raise ValueError("every project in %s needs a name and paths" % manifest)
+            if not is_safe_name(project["name"]):
+                raise ValueError("%r in %s can not be used as the name of an output file" % (project["name"], manifest))
+            if not isinstance(project["paths"], list) or not all(isinstance(path, str) for path in project["paths"]):
+                raise ValueError("the paths of %s in %s must be a list of strings" % (project["name"], manifest))
+            if project["name"] in names:
+                raise ValueError("%s has more than one project named %s" % (manifest, project["name"]))
+            names.add(project["name"])
+            project = dict(project)
+            project["paths"] = [os.path.join(root, os.path.expanduser(path)) for path in project["paths"]]
+            project["formats"] = project.get("formats", config.get("formats", ["text"]))
+            for output_format in project["formats"]:
+                if output_format not in FORMATS:
+                    raise ValueError("%s is not one of the formats %s" % (output_format, ", ".join(FORMATS)))
+            self.projects.append(project)
+
+    # Runs every project and returns the files written for each project, or the error it failed with
+    def run(self):
+        if not os.path.isdir(self.output):
+            os.makedirs(self.output)
+        # Each worker gets an equal share of the memory ceiling
+        max_memory = None
+        if self.max_memory is not None:
+            max_memory = self.max_memory / self.workers
+
+        results = {}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=start_worker,
+                                                    initargs=(self.max_trees,)) as executor:
+            futures = {executor.submit(analyse_project, project, self.output, max_memory): project["name"]
+                       for project in self.projects}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as error:
+                    results[futures[future]] = error
+        return results
@@ -0,0 +1,64 @@
+import ast
+import os
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Returns the memory currently used by this process in megabytes, or the peak if the current use is not available
+def get_memory():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes and macOS bytes
+        return peak / 1024 if os.uname().sysname == "Linux" else peak / (1024 * 1024)
+    return 0
+
+
+# Limits how long a search may take, how much memory it may use and how large the files it parses may be. Each check
+# returns the reason something should be skipped, or None if it is within the budget. The time budget, in seconds,
+# starts when the budget is created.
+class Budget:
+
+    def __init__(self, time_budget=None, max_memory=None, max_file_size=None, max_ast_nodes=None):
+        self.deadline = None if time_budget is None else time.monotonic() + time_budget
+        self.time_budget = time_budget
+        # Megabytes
+        self.max_memory = max_memory
+        # Kilobytes
+        self.max_file_size = max_file_size
+        self.max_ast_nodes = max_ast_nodes
+
+    def check_exhausted(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return "time budget of %gs exhausted" % self.time_budget
+        if self.max_memory is not None and get_memory() > self.max_memory:
+            return "memory limit of %d MB reached" % self.max_memory
+        return None
+
+    def check_file(self, filename):
+        reason = self.check_exhausted()
+        if reason is None and self.max_file_size is not None:
+            try:
+                size = os.path.getsize(filename)
+            except OSError as error:
+                return "could not be read: %s" % error
+            if size > self.max_file_size * 1024:
+                reason = "%d KB is larger than the limit of %d KB" % (size // 1024, self.max_file_size)
+        return reason
+
+    def check_tree(self, tree):
+        if self.max_ast_nodes is not None:
+            node_num = 0
+            for node in ast.walk(tree):
+                node_num += 1
+                if node_num > self.max_ast_nodes:
+                    return "more than the limit of %d syntax tree nodes" % self.max_ast_nodes
+        return None
@@ -0,0 +1,50 @@
+import ast
+import importlib
+
+try:
+    from spaghetti.loader import read_source
+except ImportError:
+    from loader import read_source
+
+
+# Stores parsed syntax trees by the digest of their source so that a file with the same contents is only parsed once,
+# even when it is shared between several searches. Also remembers where imported modules were found. With max_trees
+# the oldest trees are dropped once there are more than that many.
+class ParseCache:
+
+    def __init__(self, max_trees=None):
+        self.max_trees = max_trees
+        self.trees = {}
+        self.modules = {}
+
+    # Returns the digest of the given file along with its syntax tree, parsing it only if it has not been seen before
+    def parse(self, filename):
+        return self.parse_source(read_source(filename))
+
+    # Does the same for a source that has already been loaded
+    def parse_source(self, source):
+        if source.error is not None:
+            raise ValueError(source.error)
+        if source.digest in self.trees:
+            return source.digest, self.trees[source.digest]
+        tree = ast.parse(source.text, source.filename)
+        self.trees[source.digest] = tree
+        if self.max_trees is not None and len(self.trees) > self.max_trees:
+            del self.trees[next(iter(self.trees))]
+        return source.digest, tree
+
+    # Drops every parsed tree to free memory
+    def clear(self):
+        self.trees.clear()
+
+    # Returns the file of the module with the given name. Modules that could not be imported are remembered so that
+    # they are not tried again.
+    def find_module(self, name):
+        if name not in self.modules:
+            try:
+                self.modules[name] = importlib.import_module(name).__file__
+            except ImportError:
+                self.modules[name] = None
+        if self.modules[name] is None:
+            raise ImportError("No module named %r" % name)
+        return self.modules[name]
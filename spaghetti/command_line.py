@@ -1,16 +1,32 @@
 import argparse
+import json
 import os
+import sys
 
 try:
     from spaghetti.state import Mode
     from spaghetti.search import Search
+    from spaghetti.budget import Budget
     from spaghetti.measurements import Measurements
     from spaghetti.draw import draw_graph
+    from spaghetti.diff import diff_sources
+    from spaghetti.rules import RuleSet, check_max_violations
+    from spaghetti.batch import Batch
+    from spaghetti.export import graph_to_dict
+    from spaghetti.affected import find_affected_tests, get_test_id
+    from spaghetti.tracing import CallTracer, merge_calls
 except:
     from state import Mode
     from search import Search
+    from budget import Budget
     from measurements import Measurements
     from draw import draw_graph
+    from diff import diff_sources
+    from rules import RuleSet, check_max_violations
+    from batch import Batch
+    from export import graph_to_dict
+    from affected import find_affected_tests, get_test_id
+    from tracing import CallTracer, merge_calls
 
 
 # Gets input data supplied as command-line arguments
@@ -26,6 +42,19 @@ def get_input(filename=None):
                         help="remove instruction text and formatting")
     parser.add_argument('--measurements', '-m', action='store_true', default=False,
                         help="prints useful measurements about the relationships between functions")
+    parser.add_argument('--json', '-j', action='store_true', default=False,
+                        help="print the graph as JSON instead of text")
+    parser.add_argument('--cycle-size', type=int, default=2,
+                        help="the smallest group of functions calling each other to list with --measurements")
+    parser.add_argument('--approx', '-a', action='store_true', default=False,
+                        help="estimate the expensive --measurements from random samples with confidence intervals")
+    parser.add_argument('--samples', type=int, default=200,
+                        help="the most samples to take for each estimate with --approx")
+    parser.add_argument('--sample-time', type=float, default=None,
+                        help="the most seconds to spend estimating in total with --approx")
+    parser.add_argument('--matrix', action='store_true', default=False,
+                        help="compute --measurements from a sparse matrix with NumPy and SciPy, which is much faster "
+                             "on large graphs and adds coupling and hotspot measurements")
     parser.add_argument('--draw', '-d', action='store_true', default=False,
                         help="save to result to a .png file in new subdirectory dependency_mapping" + os.sep)
     parser.add_argument('--long', '-l', action='store_true', default=False,
@@ -34,6 +63,19 @@ def get_input(filename=None):
                         help="exclude module information so only class and function names are displayed")
     parser.add_argument('--quiet', '-q', action='store_true', default=False,
                         help="suppress non-critical errors")
+    parser.add_argument('--focus', '-f', type=str, action='append', default=None,
+                        help="only output the functions near the function or class with this name, which may be "
+                             "given more than once")
+    parser.add_argument('--radius', type=int, default=1,
+                        help="the number of calls away from the --focus functions to include")
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help="stop graphing after this many seconds and output the partial graph")
+    parser.add_argument('--max-memory', type=int, default=None,
+                        help="stop graphing once this many megabytes of memory are used and output the partial graph")
+    parser.add_argument('--max-file-size', type=int, default=None,
+                        help="skip files larger than this many kilobytes")
+    parser.add_argument('--max-ast-nodes', type=int, default=None,
+                        help="skip files with more than this many syntax tree nodes")
     args = parser.parse_args()
 
     if len(args.filename) == 0 and filename is None:
@@ -51,24 +93,81 @@ def get_input(filename=None):
     return args
 
 # Prints detailed measurments about the Networkx graph
-def print_measurements(nxg):
-    measure = Measurements(nxg)
+def print_measurements(nxg, min_cycle_size=2, approx=False, samples=200, time_budget=None):
+    measure = Measurements(nxg, min_cycle_size=min_cycle_size, approx=approx, samples=samples,
+                           time_budget=time_budget)
     print('The average number of dependents and dependencies per function: {0:.2f}'.format(measure.mean_degree))
     print('The maximum number of dependents and dependencies per function: ' + repr(measure.max_degree))
-    if measure.node_connectivity == 0:
+    print('The average number of calls made and received per function: {0:.2f}'.format(measure.mean_weighted_degree))
+    print('The maximum number of calls made and received per function: ' + repr(measure.max_weighted_degree))
+    if approx is True:
+        print('Percentage of pairs of functions that are not connected: %r' % measure.estimates["severity"])
+        print('Estimated number of functions that would need to be removed to isolate at least 1 function: %r' %
+              measure.estimates["node_connectivity"])
+        print('Estimated percentage of pairs of functions where the first calls the second directly or indirectly: '
+              '%r' % measure.estimates["reachability"])
+        if measure.max_betweenness_node is not None:
+            print('Function on the most shortest call paths: %r, betweenness %r' % (
+                measure.max_betweenness_node, measure.estimates["max_betweenness"]))
+    elif measure.node_connectivity == 0:
         print('There are isolated functions or groups of isolated functions. Severity: {0:.2f}%'.format(
             measure.severity))
     else:
         print('There are no isolated functions or groups of isolated functions. At least {:d} function(s) that '
               'would need to be removed to isolate at least 1 function.'.format(measure.node_connectivity))
     print('Total functions found in the search area: ' + repr(measure.node_num))
+    print('Depth of the dependency hierarchy with call cycles collapsed: ' + repr(measure.cycles.depth))
+    if measure.cycles.cycle_num == 0:
+        print('There are no call cycles of {:d} or more functions.'.format(min_cycle_size))
+    else:
+        print('There are {:d} call cycle(s) containing {:d} function(s). The largest has {:d} function(s).'.format(
+            measure.cycles.cycle_num, measure.cycles.nodes_in_cycles, measure.cycles.largest_cycle))
+        for component in measure.cycles.components:
+            print('    ' + ", ".join(sorted(repr(node) for node in component)))
+
+
+# Prints measurements computed in batch from a sparse adjacency matrix of the graph
+def print_matrix_measurements(graph, mode=Mode.NORMAL):
+    # NumPy and SciPy are slow to import so they are only imported when they are used
+    try:
+        from spaghetti.matrix_measurements import MatrixMeasurements
+    except ImportError:
+        from matrix_measurements import MatrixMeasurements
+    try:
+        measure = MatrixMeasurements(graph)
+    except ImportError as error:
+        print("Error: %s. Install them with pip3 install spaghetti-graph[matrix]." % error)
+        return
+    print('The average number of dependents and dependencies per function: {0:.2f}'.format(measure.mean_degree))
+    print('The maximum number of dependents and dependencies per function: ' + repr(measure.max_degree))
+    calls = measure.calls_in + measure.calls_out
+    if measure.node_num != 0:
+        print('The average number of calls made and received per function: {0:.2f}'.format(float(calls.mean())))
+        print('The maximum number of calls made and received per function: ' + repr(int(calls.max())))
+    for title, percentiles in [("dependents", measure.fan_in_percentiles),
+                               ("dependencies", measure.fan_out_percentiles)]:
+        print('Percentiles of the number of {0} per function: '.format(title) +
+              ", ".join('{0:d}th {1:.1f}'.format(p, value) for p, value in percentiles.items()))
+    print('Percentage of pairs of functions that are not connected: {0:.2f}%'.format(measure.severity))
+    print('Total functions found in the search area: ' + repr(measure.node_num))
+    print('Functions most depended upon (PageRank):')
+    for node, rank in measure.get_hotspots():
+        print('    {0:.4f} {1!r}'.format(rank, node))
+    print('Coupling of each file (afferent, efferent, instability):')
+    for i, module in enumerate(measure.modules):
+        if mode is not Mode.LONG:
+            module = module.replace(os.getcwd() + os.sep, "")
+        print('    {0:d} {1:d} {2:.2f} {3}'.format(int(measure.afferent[i]), int(measure.efferent[i]),
+                                                  float(measure.instability[i]), module))
 
 
 # Prints the results including a list of functions and their dependencies in the terminal
 def output_text(search, args):
 
-    if args.raw is True:
-        print(search.get_graph_str(mode=args.mode))
+    if args.json is True:
+        print(json.dumps(graph_to_dict(search.get_graph()), indent=2))
+    elif args.raw is True:
+        print(search.get_graph_str())
     else:
         searched_str = " ".join(search.searched_files) + " ".join(search.searched_directories)
         if searched_str != "":
@@ -87,9 +186,21 @@ def output_text(search, args):
                         unsure_str = unsure_str.replace(os.getcwd() + os.sep, "")
                     print("Could not include the following functions: %s" % unsure_str)
 
+            if search.is_partial():
+                print("Only part of the search area was graphed. Skipped:")
+                for file in sorted(search.skipped):
+                    skipped_str = file
+                    if args.mode is not Mode.LONG:
+                        skipped_str = skipped_str.replace(os.getcwd() + os.sep, "")
+                    print("    %s: %s" % (skipped_str, search.skipped[file]))
+
             if args.measurements is True:
                 print()
-                print_measurements(search.get_nx_graph())
+                if args.matrix is True:
+                    print_matrix_measurements(search.get_graph(), args.mode)
+                else:
+                    print_measurements(search.get_nx_graph(), args.cycle_size, approx=args.approx,
+                                       samples=args.samples, time_budget=args.sample_time)
 
             if args.inverse is True:
                 dependents_string = "Dependencies"
@@ -101,10 +212,229 @@ def output_text(search, args):
             print(search.get_graph_str(indent=indent))
 
 
+# Gets input data for the diff command
+def get_diff_input(argv):
+    parser = argparse.ArgumentParser(
+        prog='spaghetti diff',
+        description='Report how function level dependencies changed between two paths or git revisions')
+    parser.add_argument('old', metavar='OLD', type=str, help="the old path or git revision, such as HEAD~1 or HEAD~1:src")
+    parser.add_argument('new', metavar='NEW', type=str, help="the new path or git revision, such as HEAD or HEAD:src")
+    parser.add_argument('--measurements', '-m', action='store_true', default=False,
+                        help="also report changes in the measurements of the graph")
+    parser.add_argument('--json', '-j', action='store_true', default=False,
+                        help="print the differences as JSON")
+    return parser.parse_args(argv)
+
+
+# Prints the differences between two graphs in the terminal
+def print_diff(diff):
+    if diff.is_empty():
+        print("No dependency changes.")
+        return
+    sections = [("Added functions", diff.added), ("Removed functions", diff.removed),
+                ("Changed functions", diff.changed),
+                ("New calls", ["%s -> %s" % edge for edge in diff.new_edges]),
+                ("Dropped calls", ["%s -> %s" % edge for edge in diff.dropped_edges]),
+                ("Fan-in/fan-out changes", ["%s fan-in %d -> %d, fan-out %d -> %d" % (key, old[0], new[0], old[1], new[1])
+                                            for key, (old, new) in diff.degrees.items()]),
+                ("Measurement changes", ["%s: %s -> %s" % (name, old, new)
+                                         for name, (old, new) in diff.measurements.items()])]
+    for title, lines in sections:
+        if len(lines) != 0:
+            print("%s:" % title)
+            for line in lines:
+                print("    " + line)
+
+
+# Entry point for the diff command
+def run_diff(argv):
+    args = get_diff_input(argv)
+    try:
+        diff = diff_sources(args.old, args.new, measurements=args.measurements)
+    except ValueError as error:
+        print("Error: %s" % error)
+        return 1
+    if args.json is True:
+        print(json.dumps(diff.to_dict(), indent=2, sort_keys=True))
+    else:
+        print_diff(diff)
+    return 0
+
+
+# Gets input data for the check command
+def get_check_input(argv):
+    parser = argparse.ArgumentParser(
+        prog='spaghetti check',
+        description='Check function level dependencies against architecture rules')
+    parser.add_argument('filename', metavar='F', type=str, nargs="*", default=["."],
+                        help="the name(s) of files and directories to examine")
+    parser.add_argument('--rules', '-R', type=str, default="spaghetti.toml",
+                        help="the TOML file the rules are read from")
+    parser.add_argument('--max-violations', type=int, default=None,
+                        help="stop checking once this many violations have been found")
+    parser.add_argument('--graph-cache', type=str, default=None,
+                        help="reuse the graph saved in this file if no file changed since, otherwise save it there")
+    return parser.parse_args(argv)
+
+
+# Entry point for the check command. Exits with a nonzero status if any rule is violated.
+def run_check(argv):
+    args = get_check_input(argv)
+    try:
+        rules = RuleSet.load(args.rules)
+        if args.max_violations is not None:
+            rules.max_violations = check_max_violations(args.max_violations)
+    except (OSError, ValueError, ImportError) as error:
+        print("Error: %s" % error)
+        return 2
+    search = Search(filenames=args.filename, mode=Mode.LONG, graph_cache=args.graph_cache)
+    max_violations = rules.max_violations
+    violations = rules.check(search, max_violations=max_violations)
+    for violation in violations:
+        print(violation)
+    if len(violations) >= max_violations:
+        print("Stopped after %d violations." % len(violations))
+    elif len(violations) != 0:
+        print("%d violation(s)." % len(violations))
+    return 0 if len(violations) == 0 else 1
+
+
+# Gets input data for the batch command
+def get_batch_input(argv):
+    parser = argparse.ArgumentParser(
+        prog='spaghetti batch',
+        description='Graph many projects listed in a TOML manifest with a shared pool of worker processes')
+    parser.add_argument('manifest', metavar='MANIFEST', type=str, help="the TOML manifest listing the projects")
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help="the number of worker processes, overriding the manifest")
+    parser.add_argument('--max-memory', type=int, default=None,
+                        help="the most megabytes of memory for the whole batch, overriding the manifest")
+    return parser.parse_args(argv)
+
+
+# Entry point for the batch command. Exits with a nonzero status if any project failed.
+def run_batch(argv):
+    args = get_batch_input(argv)
+    try:
+        batch = Batch(args.manifest, workers=args.workers, max_memory=args.max_memory)
+    except (OSError, ValueError, ImportError) as error:
+        print("Error: %s" % error)
+        return 2
+    results = batch.run()
+    failed = 0
+    for name in sorted(results):
+        if isinstance(results[name], Exception):
+            failed += 1
+            print("%s: failed with %r" % (name, results[name]))
+        else:
+            print("%s: wrote %s" % (name, ", ".join(results[name])))
+    return 0 if failed == 0 else 1
+
+
+# Gets input data for the affected-tests command
+def get_affected_tests_input(argv):
+    parser = argparse.ArgumentParser(
+        prog='spaghetti affected-tests',
+        description='List the tests that call functions in the changed files, directly or indirectly')
+    parser.add_argument('filename', metavar='F', type=str, nargs="*", default=["."],
+                        help="the name(s) of files and directories to examine")
+    parser.add_argument('--changed', '-c', type=str, nargs="+", required=True,
+                        help="the files that changed")
+    parser.add_argument('--format', type=str, choices=["pytest", "unittest"], default="pytest",
+                        help="the style of test identifiers to print")
+    parser.add_argument('--graph-cache', type=str, default=None,
+                        help="reuse the graph saved in this file if no file changed since, otherwise save it there")
+    return parser.parse_args(argv)
+
+
+# Entry point for the affected-tests command. Prints one test identifier per line.
+def run_affected_tests(argv):
+    args = get_affected_tests_input(argv)
+    search = Search(filenames=args.filename, graph_cache=args.graph_cache)
+    for file in args.changed:
+        if os.path.abspath(file) not in search.file_index:
+            print("Warning: %s is not in the graph" % file, file=sys.stderr)
+    for test in find_affected_tests(search, args.changed):
+        print(get_test_id(test, args.format))
+    return 0
+
+
+# Gets input data for the trace command. The command to trace follows "--".
+def get_trace_input(argv):
+    parser = argparse.ArgumentParser(
+        prog='spaghetti trace',
+        usage='spaghetti trace [-h] [F ...] [--top N] [--json] -- COMMAND ...',
+        description='Run a Python command and add the calls it makes to the graph, weighted by how often they are made')
+    parser.add_argument('filename', metavar='F', type=str, nargs="*", default=["."],
+                        help="the name(s) of files and directories to examine")
+    parser.add_argument('--top', '-t', type=int, default=20,
+                        help="the number of most frequent calls to print")
+    parser.add_argument('--json', '-j', action='store_true', default=False,
+                        help="print the graph with its call counts as JSON instead")
+    if "--" not in argv:
+        parser.error("the command to trace must follow --")
+    split = argv.index("--")
+    args = parser.parse_args(argv[:split])
+    args.command = argv[split + 1:]
+    if len(args.command) == 0:
+        parser.error("the command to trace must follow --")
+    return args
+
+
+# Entry point for the trace command. Exits with the status of the traced command.
+def run_trace(argv):
+    args = get_trace_input(argv)
+    search = Search(filenames=args.filename)
+    # Calls within crawled imports are not graphed, so they are not traced either
+    tracer = CallTracer(files=search.files)
+    try:
+        status = tracer.run(args.command)
+    except Exception as error:
+        print("Error: %s failed with %r" % (" ".join(args.command), error), file=sys.stderr)
+        status = 1
+    added = set(merge_calls(search, tracer.calls))
+    if args.json is True:
+        print(json.dumps(graph_to_dict(search.get_graph()), indent=2))
+        return status
+
+    calls = []
+    for node in search.get_graph():
+        for edge, count in node.get_traced_calls().items():
+            calls.append((count, node, edge))
+    calls.sort(key=lambda call: (-call[0], call[1].get_string(), call[2].get_string()))
+    print("Calls traced: %d, missing from the static graph: %d" % (len(calls), len(added)))
+    for count, node, edge in calls[:args.top]:
+        missed = " (missing from the static graph)" if (node, edge) in added else ""
+        print("%8d %s -> %s%s" % (count, node, edge, missed))
+    return status
+
+
+# Commands that can be given as the first argument instead of filenames
+COMMANDS = {
+    "diff": run_diff,
+    "check": run_check,
+    "batch": run_batch,
+    "affected-tests": run_affected_tests,
+    "trace": run_trace,
+}
+
+
 # Entry point for command-line interface
 def main(filename=None):
+    if filename is None and len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
     args = get_input(filename)
-    search = Search(filenames=args.filename, inverse=args.inverse, mode=args.mode)
+    budget = Budget(time_budget=args.time_budget, max_memory=args.max_memory, max_file_size=args.max_file_size,
+                    max_ast_nodes=args.max_ast_nodes)
+    search = Search(filenames=args.filename, inverse=args.inverse, mode=args.mode, budget=budget)
+    if args.focus is not None:
+        if len(search.focus(args.focus, args.radius)) == 0:
+            print("Error: Could not find a function named %s" % " or ".join(args.focus))
+            sys.exit(2)
+        if search.get_nx_graph().number_of_nodes() == 0:
+            print("Error: No function in the search area is within %d calls of %s" % (args.radius,
+                                                                                     " or ".join(args.focus)))
+            sys.exit(2)
     output_text(search, args)
     if args.draw is True:
         title = " ".join(args.filename)
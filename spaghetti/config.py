@@ -0,0 +1,18 @@
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+# Reads a TOML configuration file such as a rules file or batch manifest
+def load_toml(filename):
+    if tomllib is None:
+        raise ImportError("reading %s requires Python 3.11 or the tomli package" % filename)
+    with open(filename, 'rb') as config_file:
+        try:
+            return tomllib.load(config_file)
+        except tomllib.TOMLDecodeError as error:
+            raise ValueError("%s is not valid TOML: %s" % (filename, error))
@@ -0,0 +1,82 @@
+# Returns the strongly connected components of a graph in reverse topological order using an iterative version of
+# Tarjan's algorithm, so that deep graphs do not reach the recursion limit. Works on a Networkx graph with
+# successors=nxg.successors or on the graph of a search with successors=lambda node: node.get_edges(dependency=True).
+def strongly_connected_components(nodes, successors):
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        # Each entry is a node and the iterator over the successors it has not visited yet
+        work = [(root, iter(successors(root)))]
+        while len(work) != 0:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors(child))))
+                    break
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if len(work) != 0:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+# Stores the call cycles of the given Networkx graph. Cycles are strongly connected components: groups of functions
+# that can all reach each other through their calls.
+class CycleReport:
+
+    def __init__(self, nxg, min_size=2):
+        self.nxg = nxg
+        self.min_size = min_size
+
+        components = strongly_connected_components(self.nxg, self.nxg.successors)
+
+        # Components come out with their successors first, so the depth of each is known when it is reached
+        component_of = {}
+        depths = []
+        for i, component in enumerate(components):
+            depth = 0
+            for node in component:
+                component_of[node] = i
+            for node in component:
+                for child in self.nxg.successors(node):
+                    if component_of[child] != i:
+                        depth = max(depth, depths[component_of[child]])
+            depths.append(depth + 1)
+
+        # The number of levels in the graph once every cycle is collapsed into a single node
+        self.depth = max(depths, default=0)
+        self.components = sorted((component for component in components if self.is_cycle(component)),
+                                 key=len, reverse=True)
+        self.cycle_num = len(self.components)
+        self.largest_cycle = len(self.components[0]) if self.cycle_num != 0 else 0
+        self.nodes_in_cycles = sum(len(component) for component in self.components)
+
+    # A single function is only a cycle if it calls itself
+    def is_cycle(self, component):
+        if len(component) < self.min_size:
+            return False
+        return len(component) > 1 or self.nxg.has_edge(component[0], component[0])
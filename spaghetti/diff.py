@@ -0,0 +1,178 @@
+import ast
+import collections
+import io
+import os
+import subprocess
+import tarfile
+import tempfile
+
+try:
+    from spaghetti.cache import ParseCache
+    from spaghetti.measurements import Measurements
+    from spaghetti.search import Search
+    from spaghetti.state import Mode
+except ImportError:
+    from cache import ParseCache
+    from measurements import Measurements
+    from search import Search
+    from state import Mode
+
+
+MEASUREMENT_NAMES = ["node_num", "max_degree", "mean_degree", "severity"]
+
+
+# Returns a directory containing the given source. Paths are used as they are, anything else is treated as a git
+# revision and its Python files are extracted into workdir.
+def checkout(source, workdir):
+    if os.path.exists(os.path.expanduser(source)):
+        return os.path.abspath(os.path.expanduser(source))
+    try:
+        archive = subprocess.run(["git", "archive", "--format=tar", source, "--", "*.py"], check=True,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+    except (OSError, subprocess.CalledProcessError):
+        raise ValueError("%s is neither a path nor a git revision" % source)
+    directory = tempfile.mkdtemp(dir=workdir)
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        # The data filter, where tarfile has it, keeps members from being extracted outside the directory
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(directory, filter="data")
+        else:
+            tar.extractall(directory)
+    return directory
+
+
+# Searches the old and new sources and returns their differences. Only the old source is searched in full. The graph
+# of the new source is updated from it, so files whose contents did not change are not parsed or resolved again.
+def diff_sources(old, new, measurements=False):
+    cache = ParseCache()
+    with tempfile.TemporaryDirectory() as workdir:
+        old_root = checkout(old, workdir)
+        new_root = checkout(new, workdir)
+        old_search = Search(filenames=[old_root], mode=Mode.SIMPLE, cache=cache)
+        new_search = Search(filenames=[new_root], mode=Mode.SIMPLE, cache=cache, base=old_search)
+        return GraphDiff(old_search, old_root, new_search, new_root, measurements=measurements)
+
+
+# Stores the differences between the graphs of two searches. Functions are matched by their path relative to the root
+# of their search so that two copies of a tree can be compared. Only functions in the searched files are compared.
+# Measurements are computed from a sparse matrix if NumPy and SciPy are installed and estimated otherwise.
+class GraphDiff:
+
+    def __init__(self, old_search, old_root, new_search, new_root, measurements=False):
+        old_root = self.get_directory(old_root)
+        new_root = self.get_directory(new_root)
+        old_nodes = self.get_nodes(old_search, old_root)
+        new_nodes = self.get_nodes(new_search, new_root)
+        old_digests = self.get_digests(old_search, old_root)
+        new_digests = self.get_digests(new_search, new_root)
+
+        self.changed_files = sorted(path for path in set(old_digests) | set(new_digests)
+                                    if old_digests.get(path) != new_digests.get(path))
+        self.added = sorted(set(new_nodes) - set(old_nodes))
+        self.removed = sorted(set(old_nodes) - set(new_nodes))
+
+        # Only functions in files whose contents differ can have changed
+        changed_files = set(self.changed_files)
+        self.changed = []
+        for key in sorted(set(old_nodes) & set(new_nodes)):
+            if key.split(":")[0] in changed_files:
+                if self.dump(old_nodes[key]) != self.dump(new_nodes[key]):
+                    self.changed.append(key)
+
+        old_edges = self.get_edges(old_nodes)
+        new_edges = self.get_edges(new_nodes)
+        self.new_edges = sorted(new_edges - old_edges)
+        self.dropped_edges = sorted(old_edges - new_edges)
+
+        # Fan-in is the number of dependents and fan-out the number of dependencies
+        self.degrees = {}
+        old_degrees = self.get_degrees(old_edges)
+        new_degrees = self.get_degrees(new_edges)
+        for key in sorted(set(old_nodes) & set(new_nodes)):
+            old_degree = old_degrees.get(key, (0, 0))
+            new_degree = new_degrees.get(key, (0, 0))
+            if old_degree != new_degree:
+                self.degrees[key] = (old_degree, new_degree)
+
+        self.measurements = {}
+        if measurements is True:
+            old_measure = self.measure(old_search)
+            new_measure = self.measure(new_search)
+            for name in MEASUREMENT_NAMES:
+                if getattr(old_measure, name) != getattr(new_measure, name):
+                    self.measurements[name] = (getattr(old_measure, name), getattr(new_measure, name))
+
+    # Files are compared relative to the directory they are in
+    def get_directory(self, root):
+        root = os.path.abspath(root)
+        if os.path.isfile(root):
+            return os.path.dirname(root)
+        return root
+
+    # Returns the nodes of the search keyed by a name that does not depend on where the root is. Functions outside the
+    # searched files, such as those of the standard library and calls that could not be resolved, are left out.
+    def get_nodes(self, search, root):
+        nodes = {}
+        for node in search.graph:
+            if node.is_secondary() is False:
+                nodes[self.get_key(node, root)] = node
+        return nodes
+
+    def get_key(self, node, root):
+        filename = node.get_path()
+        if filename.startswith(root + os.sep):
+            filename = os.path.relpath(filename, root)
+        return filename + ":" + node.get_class() + "." + node.get_name()
+
+    def get_digests(self, search, root):
+        return {os.path.relpath(file, root): digest for file, digest in search.digests.items()}
+
+    def get_edges(self, nodes):
+        keys = {node: key for key, node in nodes.items()}
+        edges = set()
+        for key, node in nodes.items():
+            for edge in node.get_edges(dependency=True):
+                if edge in keys:
+                    edges.add((key, keys[edge]))
+        return edges
+
+    # Returns the fan-in and fan-out of each function with any edges
+    def get_degrees(self, edges):
+        fan_in = collections.Counter(dependency for caller, dependency in edges)
+        fan_out = collections.Counter(caller for caller, dependency in edges)
+        return {key: (fan_in[key], fan_out[key]) for key in set(fan_in) | set(fan_out)}
+
+    # NumPy and SciPy are slow to import so the matrix engine is only imported when measurements are compared
+    def measure(self, search):
+        try:
+            from spaghetti.matrix_measurements import MatrixMeasurements
+        except ImportError:
+            from matrix_measurements import MatrixMeasurements
+        try:
+            return MatrixMeasurements(search.graph)
+        except ImportError:
+            return Measurements(search.get_nx_graph(), approx=True, seed=0)
+
+    # Returns a representation of the function's code that ignores where it is in the file
+    def dump(self, node):
+        if node.get_ast_node() is None:
+            return None
+        return ast.dump(node.get_ast_node())
+
+    def is_empty(self):
+        return not (self.added or self.removed or self.changed or self.new_edges or self.dropped_edges or
+                    self.degrees or self.measurements)
+
+    # Returns the differences as plain data that can be serialized
+    def to_dict(self):
+        return {
+            "changed_files": self.changed_files,
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+            "new_edges": [list(edge) for edge in self.new_edges],
+            "dropped_edges": [list(edge) for edge in self.dropped_edges],
+            "degrees": {key: {"fan_in": [old[0], new[0]], "fan_out": [old[1], new[1]]}
+                        for key, (old, new) in self.degrees.items()},
+            "measurements": {name: list(values) for name, values in self.measurements.items()},
+        }
@@ -1,7 +1,6 @@
 import networkx
 import os
 import time
-import matplotlib.pyplot as plt
 
 try:
     from spaghetti.state import Mode
@@ -11,6 +10,9 @@ except ImportError:
 
 # Creates an image of the supplied Networkx graph and saves it to a relative folder
 def draw_graph(nxg, title, mode=Mode.NORMAL):
+    # Matplotlib is slow to import so it is only imported when something is drawn
+    import matplotlib.pyplot as plt
+
     if mode is Mode.SIMPLE:
         node_size = 400
         width = 4
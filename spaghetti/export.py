@@ -0,0 +1,49 @@
+# Returns an identifier for the node that is unique within the graph and does not depend on the mode
+def get_id(node):
+    return node.get_path() + ":" + node.get_class() + "." + node.get_name()
+
+
+# Returns the graph as plain data that can be serialized, for example as JSON. Edges go from each function to the
+# functions it calls and are weighted by the number of places the call is made from, listed by line number.
+def graph_to_dict(graph):
+    nodes = []
+    edges = []
+    for node in sorted(graph, key=lambda the_node: the_node.get_string()):
+        nodes.append({
+            "id": get_id(node),
+            "file": node.get_path(),
+            "class": node.get_class(),
+            "name": node.get_name(),
+            "secondary": node.is_secondary(),
+        })
+        for edge in sorted(node.get_edges(dependency=True), key=lambda the_node: the_node.get_string()):
+            # The graph may only be part of the search
+            if edge not in graph:
+                continue
+            edge_dict = {"source": get_id(node), "target": get_id(edge), "weight": node.get_weight(edge),
+                         "lines": list(node.get_call_lines(edge))}
+            if node.get_calls(edge) != 0:
+                edge_dict["calls"] = node.get_calls(edge)
+            edges.append(edge_dict)
+    return {"nodes": nodes, "edges": edges}
+
+
+# Returns the measurements as plain data that can be serialized
+def measurements_to_dict(measure):
+    data = {
+        "node_num": measure.node_num,
+        "max_degree": measure.max_degree,
+        "mean_degree": measure.mean_degree,
+        "max_weighted_degree": measure.max_weighted_degree,
+        "mean_weighted_degree": measure.mean_weighted_degree,
+        "node_connectivity": measure.node_connectivity,
+        "severity": measure.severity,
+        "cycle_depth": measure.cycles.depth,
+        "cycles": [sorted(get_id(node) for node in component) for component in measure.cycles.components],
+    }
+    # Estimates are kept separate so that the type of each measurement does not depend on how it was measured
+    data["estimates"] = {}
+    for name, estimate in measure.estimates.items():
+        data["estimates"][name] = {"value": estimate.value, "low": estimate.low, "high": estimate.high,
+                                   "samples": estimate.samples, "kind": estimate.kind}
+    return data
@@ -1,3 +1,4 @@
+import array
 import os
 
 try:
@@ -20,6 +21,10 @@ class FuncNode:
         self._dependencies = set()
         # All the other nodes that call this node.
         self._dependents = set()
+        # The line numbers of the calls to each dependency, one per call site
+        self._call_lines = {}
+        # How many times this node was seen calling each of its dependencies while tracing
+        self._calls = {}
         self._ast_node = ast_node
         self.mode = mode
 
@@ -45,15 +50,24 @@ class FuncNode:
         else:
             return ""
 
+    # Returns the full path of the file the node is in regardless of the mode
+    def get_path(self):
+        return self._filename
+
     def get_class(self):
         return self._class_name
 
     def get_name(self):
         return self._name
 
-    def add_edge(self, edge, dependency=False):
+    # A line number can be given for the call site of a dependency so that repeated calls are counted
+    def add_edge(self, edge, dependency=False, line=None):
         if dependency is True:
             self._dependencies.add(edge)
+            if line is not None:
+                if edge not in self._call_lines:
+                    self._call_lines[edge] = array.array('I')
+                self._call_lines[edge].append(line)
         else:
             self._dependents.add(edge)
 
@@ -63,6 +77,25 @@ class FuncNode:
         else:
             return self._dependents
 
+    # Returns the line numbers of the calls to the given dependency
+    def get_call_lines(self, edge):
+        return self._call_lines.get(edge, ())
+
+    # Returns the number of places this node calls the given dependency from, or 1 if they are not known
+    def get_weight(self, edge):
+        return max(len(self._call_lines.get(edge, ())), 1)
+
+    def add_calls(self, edge, count):
+        self._calls[edge] = self._calls.get(edge, 0) + count
+
+    # Returns how many times this node was traced calling the given dependency
+    def get_calls(self, edge):
+        return self._calls.get(edge, 0)
+
+    # Returns the number of traced calls to each dependency that was traced
+    def get_traced_calls(self):
+        return self._calls
+
     def get_ast_node(self):
         return self._ast_node
 
@@ -88,10 +121,12 @@ class FuncNode:
         else:
             return False
 
-    # Returns a string of all the edges
-    def get_edges_str(self, dependency=False):
+    # Returns a string of all the edges, or only those to the given nodes
+    def get_edges_str(self, dependency=False, nodes=None):
         return_str = ""
         for edge in sorted(self.get_edges(dependency=dependency), key=lambda the_node: the_node.get_string()):
+            if nodes is not None and edge not in nodes:
+                continue
             return_str += "(" + repr(edge) + ") "
         return return_str
 
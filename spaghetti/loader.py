@@ -0,0 +1,75 @@
+import collections
+import concurrent.futures
+import hashlib
+import io
+import mmap
+import os
+import tokenize
+
+
+# Files at least this many bytes are memory mapped instead of read
+MMAP_SIZE = 1024 * 1024
+
+
+# The decoded text of a source file along with the digest of its bytes. If the file could not be loaded the reason is
+# stored in error instead.
+class Source:
+
+    def __init__(self, filename, digest=None, text=None, encoding=None, error=None):
+        self.filename = filename
+        self.digest = digest
+        self.text = text
+        self.encoding = encoding
+        self.error = error
+
+
+# Reads and decodes a source file using the encoding declared in it, as Python itself would. If check returns a reason
+# for the file to be skipped it is not read at all. Files of at least mmap_size bytes are hashed and decoded straight
+# from a memory mapping so that their bytes are never copied into memory.
+def read_source(filename, check=None, mmap_size=MMAP_SIZE):
+    if check is not None:
+        reason = check(filename)
+        if reason is not None:
+            return Source(filename, error=reason)
+    try:
+        with open(filename, 'rb') as source_file:
+            if os.fstat(source_file.fileno()).st_size >= mmap_size:
+                with mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return decode_source(filename, mapped, mapped.readline)
+            data = source_file.read()
+        return decode_source(filename, data, io.BytesIO(data).readline)
+    except (OSError, SyntaxError, UnicodeDecodeError, LookupError) as error:
+        return Source(filename, error="could not be read: %s" % error)
+
+
+# Decodes the bytes of a source file, or a buffer holding them, using the encoding found by reading its first lines
+def decode_source(filename, data, readline):
+    encoding, lines = tokenize.detect_encoding(readline)
+    return Source(filename, hashlib.sha1(data).hexdigest(), str(data, encoding), encoding)
+
+
+# Loads source files ahead of the parser with a pool of threads so that waiting on the file system overlaps with
+# parsing. At most prefetch files are held in memory waiting to be parsed and at most workers files are open at once.
+class SourceLoader:
+
+    def __init__(self, workers=8, prefetch=32, mmap_size=MMAP_SIZE):
+        self.workers = workers
+        self.prefetch = max(prefetch, 1)
+        self.mmap_size = mmap_size
+
+    # Yields the source of each file in the order given
+    def load(self, filenames, check=None):
+        filenames = iter(filenames)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = collections.deque()
+            for filename in filenames:
+                pending.append(executor.submit(read_source, filename, check, self.mmap_size))
+                if len(pending) == self.prefetch:
+                    break
+            while len(pending) != 0:
+                source = pending.popleft().result()
+                # Keeps the threads busy while the caller parses this file
+                filename = next(filenames, None)
+                if filename is not None:
+                    pending.append(executor.submit(read_source, filename, check, self.mmap_size))
+                yield source
@@ -0,0 +1,114 @@
+try:
+    import numpy
+    from scipy import sparse
+    from scipy.sparse import csgraph
+except ImportError:
+    numpy = None
+
+
+PERCENTILES = [50, 90, 99]
+
+
+# Stores measurements of the primary search area computed in batch from a sparse adjacency matrix. Requires NumPy and
+# SciPy. Rows call columns, so fan-in is the number of dependents of a function and fan-out its dependencies. Each entry
+# is the number of places the row calls the column from, so PageRank favours functions that are called often.
+class MatrixMeasurements:
+
+    def __init__(self, graph, damping=0.85, tolerance=1.0e-10, max_iterations=100):
+        if numpy is None:
+            raise ImportError("matrix measurements require numpy and scipy")
+
+        # Builds the matrix in a single pass over the graph
+        self.nodes = [node for node in graph if node.is_secondary() is False]
+        positions = {node: i for i, node in enumerate(self.nodes)}
+        rows = []
+        cols = []
+        weights = []
+        for i, node in enumerate(self.nodes):
+            for edge in node.get_edges(dependency=True):
+                if edge in positions:
+                    rows.append(i)
+                    cols.append(positions[edge])
+                    weights.append(node.get_weight(edge))
+        self.node_num = len(self.nodes)
+        rows = numpy.array(rows, dtype=numpy.int64)
+        cols = numpy.array(cols, dtype=numpy.int64)
+        weights = numpy.array(weights, dtype=numpy.float64)
+        self.matrix = sparse.csr_matrix((weights, (rows, cols)), shape=(self.node_num, self.node_num))
+
+        self.fan_in = numpy.bincount(cols, minlength=self.node_num)
+        self.fan_out = numpy.diff(self.matrix.indptr)
+        # The number of call sites rather than functions
+        self.calls_in = numpy.bincount(cols, weights=weights, minlength=self.node_num)
+        self.calls_out = numpy.asarray(self.matrix.sum(axis=1)).ravel()
+        degrees = self.fan_in + self.fan_out
+        self.max_degree = int(degrees.max()) if self.node_num != 0 else 0
+        self.mean_degree = float(degrees.mean()) if self.node_num != 0 else 0.0
+        self.fan_in_percentiles = self.get_percentiles(self.fan_in)
+        self.fan_out_percentiles = self.get_percentiles(self.fan_out)
+
+        self.severity = self.get_severity()
+        self.pagerank = self.get_pagerank(damping, tolerance, max_iterations)
+        self.modules, self.afferent, self.efferent, self.instability = self.get_coupling(rows, cols)
+
+    def get_percentiles(self, values):
+        if len(values) == 0:
+            return {percentile: 0.0 for percentile in PERCENTILES}
+        return dict(zip(PERCENTILES, numpy.percentile(values, PERCENTILES).tolist()))
+
+    # The percentage of pairs of functions that are not connected by calls in either direction
+    def get_severity(self):
+        if self.node_num < 2:
+            return 0.0
+        component_num, labels = csgraph.connected_components(self.matrix, directed=True, connection='weak')
+        sizes = numpy.bincount(labels).astype(numpy.float64)
+        connected_pairs = float((sizes * (sizes - 1)).sum())
+        return 100 - 100 * connected_pairs / (self.node_num * (self.node_num - 1))
+
+    # Ranks functions by how much of the code ends up depending on them by power iteration
+    def get_pagerank(self, damping, tolerance, max_iterations):
+        if self.node_num == 0:
+            return numpy.zeros(0)
+        out_weights = numpy.asarray(self.matrix.sum(axis=1)).ravel()
+        dangling = out_weights == 0
+        scale = numpy.divide(1.0, out_weights, out=numpy.zeros(self.node_num), where=~dangling)
+        transition = sparse.diags(scale) @ self.matrix
+        transition = transition.T.tocsr()
+        rank = numpy.full(self.node_num, 1.0 / self.node_num)
+        for i in range(max_iterations):
+            new_rank = damping * (transition @ rank + rank[dangling].sum() / self.node_num)
+            new_rank += (1 - damping) / self.node_num
+            if numpy.abs(new_rank - rank).sum() < tolerance:
+                return new_rank
+            rank = new_rank
+        return rank
+
+    # Computes the coupling of each file. Afferent coupling is the number of functions in other files calling into
+    # the file, efferent coupling the number of functions in the file calling out of it and instability is
+    # efferent / (afferent + efferent).
+    def get_coupling(self, rows, cols):
+        modules, membership = numpy.unique([node.get_path() for node in self.nodes], return_inverse=True)
+        membership = membership.ravel()
+        module_num = len(modules)
+        if module_num == 0:
+            empty = numpy.zeros(0)
+            return [], empty, empty, empty
+        crossing = membership[rows] != membership[cols]
+        rows = rows[crossing]
+        cols = cols[crossing]
+
+        callers = sparse.csr_matrix((numpy.ones(len(rows)), (rows, membership[cols])),
+                                    shape=(self.node_num, module_num))
+        # Counts each calling function once per module it calls into
+        afferent = numpy.diff(callers.tocsc().indptr)
+        calls_out = numpy.zeros(self.node_num, dtype=bool)
+        calls_out[rows] = True
+        efferent = numpy.bincount(membership[calls_out], minlength=module_num)
+        total = afferent + efferent
+        instability = numpy.divide(efferent, total, out=numpy.zeros(module_num), where=total != 0)
+        return [str(module) for module in modules], afferent, efferent, instability
+
+    # Returns the functions with the highest rank together with their rank
+    def get_hotspots(self, number=10):
+        order = numpy.argsort(-self.pagerank, kind='stable')[:number]
+        return [(self.nodes[i], float(self.pagerank[i])) for i in order]
@@ -1,25 +1,52 @@
 import networkx
+import random
 import statistics
+import time
 
+try:
+    from spaghetti.cycles import CycleReport
+    from spaghetti import sampling
+except ImportError:
+    from cycles import CycleReport
+    import sampling
 
-# Stores useful measurements on the given Networkx graph
+
+# Stores useful measurements on the given Networkx graph. With approx the expensive measurements are estimated from
+# samples, taking at most the given number of samples for each and the time budget in seconds for all the
+# measurements, and their confidence intervals are stored in estimates.
 class Measurements:
 
-    def __init__(self, nxg):
+    def __init__(self, nxg, min_cycle_size=2, approx=False, samples=200, time_budget=None, seed=None):
         if not isinstance(nxg, networkx.classes.digraph.DiGraph):
             raise TypeError
         self.nxg = nxg
+        # The exact measurements taken before estimating count against the time budget as well
+        deadline = None if time_budget is None else time.monotonic() + time_budget
 
         degree_sequence = sorted([d for n, d in self.nxg.degree()], reverse=True)
-        # all_pairs_con = networkx.algorithms.approximation.connectivity.all_pairs_node_connectivity(self.nxg)
-        all_pairs_con = networkx.algorithms.connectivity.connectivity.all_pairs_node_connectivity(
-            self.nxg.to_undirected())
-
         self.node_num = self.nxg.number_of_nodes()
-        self.node_connectivity = networkx.algorithms.connectivity.connectivity.node_connectivity(
-            self.nxg.to_undirected())
         self.max_degree = max(degree_sequence)
         self.mean_degree = statistics.mean(degree_sequence)
+        # Counts each place a function is called from rather than each function calling it
+        weighted_degrees = [d for n, d in self.nxg.degree(weight="weight")]
+        self.max_weighted_degree = max(weighted_degrees)
+        self.mean_weighted_degree = statistics.mean(weighted_degrees)
+
+        self.cycles = CycleReport(self.nxg, min_size=min_cycle_size)
+
+        self.estimates = {}
+        if approx is True:
+            self.estimate(samples, deadline, random.Random(seed))
+        else:
+            self.measure()
+
+    def measure(self):
+        # The undirected copy is only made once
+        undirected = self.nxg.to_undirected()
+        # all_pairs_con = networkx.algorithms.approximation.connectivity.all_pairs_node_connectivity(self.nxg)
+        all_pairs_con = networkx.algorithms.connectivity.connectivity.all_pairs_node_connectivity(undirected)
+
+        self.node_connectivity = networkx.algorithms.connectivity.connectivity.node_connectivity(undirected)
 
         num_connected_nodes = 0
         potential_pairs = 0
@@ -29,4 +56,33 @@ class Measurements:
                 if all_pairs_con[node][pair] > 0:
                     num_connected_nodes += 1
 
-        self.severity = 100 - 100 * (num_connected_nodes / potential_pairs)
+        # A single function has no pairs to be unconnected
+        if potential_pairs == 0:
+            self.severity = 0.0
+        else:
+            self.severity = 100 - 100 * (num_connected_nodes / potential_pairs)
+
+    # Estimates the measurements that would otherwise need every pair of functions before the deadline. Each sampled
+    # measurement gets an equal share of the time left when it starts.
+    def estimate(self, samples, deadline, rng):
+        start = time.monotonic()
+        self.estimates["severity"] = sampling.estimate_severity(self.nxg)
+        # Every sample searches through the graph, which takes about as long as finding its components did
+        duration = time.monotonic() - start
+
+        def share(remaining):
+            if deadline is None:
+                return None
+            now = time.monotonic()
+            return now + max(deadline - now, 0) / remaining
+
+        self.estimates["node_connectivity"] = sampling.estimate_node_connectivity(self.nxg, rng, samples, share(3),
+                                                                                 duration)
+        self.estimates["reachability"] = sampling.estimate_reachability(self.nxg, rng, samples, share(2), duration)
+        self.betweenness, self.max_betweenness_node, self.estimates["max_betweenness"] = \
+            sampling.estimate_betweenness(self.nxg, rng, samples, share(1), duration)
+
+        self.severity = self.estimates["severity"].value
+        self.node_connectivity = self.estimates["node_connectivity"].value
+        self.reachability = self.estimates["reachability"].value
+        self.max_betweenness = self.estimates["max_betweenness"].value
@@ -0,0 +1,122 @@
+import fnmatch
+import os
+import re
+
+try:
+    from spaghetti.config import load_toml
+except ImportError:
+    from config import load_toml
+
+
+# Compiles one or more path globs into a single matcher. Paths are relative to the current working directory.
+def compile_globs(globs):
+    if isinstance(globs, str):
+        globs = [globs]
+    if len(globs) == 0:
+        raise ValueError("a rule needs at least one path glob")
+    pattern = re.compile("|".join(fnmatch.translate(os.path.normpath(glob)) for glob in globs))
+    cache = {}
+
+    # Each path is only matched once no matter how many nodes are in it
+    def match(path):
+        if path not in cache:
+            cache[path] = pattern.match(os.path.relpath(path)) is not None
+        return cache[path]
+    return match
+
+
+# Forbids functions in files matching one glob from calling functions in files matching another
+class ForbiddenRule:
+
+    def __init__(self, name, source, target):
+        self.name = name
+        self.source = compile_globs(source)
+        self.target = compile_globs(target)
+
+    def check(self, node, violations):
+        for dependency in node.get_edges(dependency=True):
+            if self.target(dependency.get_path()):
+                violations.append("%s: %r calls %r" % (self.name, node, dependency))
+
+
+# Limits the number of dependents (fan-in) and dependencies (fan-out) of functions in files matching a glob
+class DegreeRule:
+
+    def __init__(self, name, source, max_fan_in=None, max_fan_out=None):
+        self.name = name
+        self.source = compile_globs(source)
+        self.max_fan_in = max_fan_in
+        self.max_fan_out = max_fan_out
+
+    def check(self, node, violations):
+        if self.max_fan_in is not None and node.get_indegree() > self.max_fan_in:
+            violations.append("%s: %r has fan-in %d > %d" % (self.name, node, node.get_indegree(), self.max_fan_in))
+        if self.max_fan_out is not None and node.get_outdegree() > self.max_fan_out:
+            violations.append("%s: %r has fan-out %d > %d" % (self.name, node, node.get_outdegree(),
+                                                              self.max_fan_out))
+
+
+# Returns the maximum number of violations if it is a whole number of at least 1. Stopping after no violations would
+# let a check with violations pass.
+def check_max_violations(max_violations):
+    if not isinstance(max_violations, int) or isinstance(max_violations, bool) or max_violations < 1:
+        raise ValueError("max_violations must be a whole number of at least 1, not %r" % (max_violations,))
+    return max_violations
+
+
+# A set of architecture rules compiled once and checked against the graph of a search
+class RuleSet:
+
+    def __init__(self, rules, max_violations=20):
+        self.rules = rules
+        self.max_violations = check_max_violations(max_violations)
+
+    # Reads rules from a TOML file such as:
+    #
+    # max_violations = 20
+    #
+    # [[forbid]]
+    # name = "api must not call db"
+    # from = "api/*"
+    # to = ["db/*", "models/*"]
+    #
+    # [[limit]]
+    # from = "*"
+    # max_fan_in = 50
+    @classmethod
+    def load(cls, filename):
+        config = load_toml(filename)
+        for kind in ["forbid", "limit"]:
+            if not isinstance(config.get(kind, []), list) or \
+                    not all(isinstance(rule, dict) for rule in config.get(kind, [])):
+                raise ValueError("every %s rule in %s must be a table, such as [[%s]]" % (kind, filename, kind))
+        rules = []
+        try:
+            for i, rule in enumerate(config.get("forbid", [])):
+                rules.append(ForbiddenRule(rule.get("name", "forbid %d" % (i + 1)), rule["from"], rule["to"]))
+            for i, rule in enumerate(config.get("limit", [])):
+                rules.append(DegreeRule(rule.get("name", "limit %d" % (i + 1)), rule.get("from", "*"),
+                                        rule.get("max_fan_in"), rule.get("max_fan_out")))
+        except KeyError as error:
+            raise ValueError("a rule in %s is missing %s" % (filename, error))
+        return cls(rules, config.get("max_violations", 20))
+
+    # Returns the violations found in the search, stopping once max_violations have been found
+    def check(self, search, max_violations=None):
+        if max_violations is None:
+            max_violations = self.max_violations
+        check_max_violations(max_violations)
+        violations = []
+        # Rules are selected once per file so that only nodes in files they apply to are visited
+        for filename, nodes in search.file_index.items():
+            rules = [rule for rule in self.rules if rule.source(filename)]
+            if len(rules) == 0:
+                continue
+            for node in nodes:
+                if node.is_secondary() is True:
+                    continue
+                for rule in rules:
+                    rule.check(node, violations)
+                    if len(violations) >= max_violations:
+                        return violations[:max_violations]
+        return violations
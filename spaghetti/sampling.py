@@ -0,0 +1,233 @@
+import math
+import time
+from collections import deque
+
+import networkx
+
+
+# The normal quantile used for 95% confidence intervals
+Z_95 = 1.96
+# The fewest samples a confidence interval is given for, since a handful of equal samples would give a zero width
+MIN_SAMPLES = 10
+
+
+# A measurement estimated from samples together with its confidence interval. Some measurements are exact, or only
+# bounded by the samples, rather than estimated with a confidence interval, and their kind says so.
+class Estimate:
+
+    INTERVAL = "interval"
+    BOUND = "bound"
+    EXACT = "exact"
+
+    def __init__(self, value, low, high, samples, kind=INTERVAL):
+        self.value = value
+        self.low = low
+        self.high = high
+        self.samples = samples
+        self.kind = kind
+
+    def __repr__(self):
+        if self.kind == Estimate.EXACT:
+            return "{0:.2f} (exact)".format(self.value)
+        if self.kind == Estimate.BOUND:
+            return "{0:.2f} (upper bound from {1:d} samples, at least {2:.2f})".format(self.value, self.samples,
+                                                                                      self.low)
+        if self.samples < MIN_SAMPLES:
+            return "{0:.2f} ({1:d} samples, too few for a CI)".format(self.value, self.samples)
+        return "{0:.2f} (95% CI {1:.2f} to {2:.2f}, {3:d} samples)".format(self.value, self.low, self.high,
+                                                                         self.samples)
+
+
+# Returns the mean of the samples with the bounds of its 95% confidence interval. With fewer than MIN_SAMPLES samples
+# the interval is the whole range between low and high.
+def mean_estimate(values, low=-math.inf, high=math.inf):
+    if len(values) == 0:
+        return Estimate(0.0, low, high, 0)
+    mean = sum(values) / len(values)
+    if len(values) >= MIN_SAMPLES:
+        variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+        margin = Z_95 * math.sqrt(variance / len(values))
+    else:
+        margin = math.inf
+    return Estimate(mean, max(low, mean - margin), min(high, mean + margin), len(values))
+
+
+# Returns whether something taking the given number of seconds can finish before the deadline from time.monotonic()
+def has_time(deadline, duration=0.0):
+    return deadline is None or time.monotonic() + duration <= deadline
+
+
+# Calls sample() until the number of samples is reached or the deadline would pass during the next sample, judging by
+# the longest sample so far or the expected duration before the first. A sample returning None has nothing more to
+# add, or ran out of time, and ends sampling.
+def take_samples(sample, samples, deadline=None, duration=0.0):
+    values = []
+    longest = duration
+    while len(values) < samples and has_time(deadline, longest):
+        start = time.monotonic()
+        value = sample()
+        longest = max(longest, time.monotonic() - start)
+        if value is None:
+            break
+        values.append(value)
+    return values
+
+
+# Returns the functions calling or called by the node, ignoring the direction of calls
+def get_neighbours(nxg, node):
+    neighbours = set(nxg.successors(node))
+    neighbours.update(nxg.predecessors(node))
+    neighbours.discard(node)
+    return neighbours
+
+
+# Counts the paths between source and target ignoring the direction of calls that share no other function, stopping
+# once limit is reached. Each function other than the source and target can carry one path, and paths are added along
+# augmenting paths found by breadth first search without building a flow network for the whole graph. Returns None if
+# the deadline passes first.
+def count_disjoint_paths(nxg, source, target, limit, deadline=None):
+    # The functions carrying a path and the calls the paths take in each direction
+    used = set()
+    flow = set()
+    paths = 0
+    while paths < limit:
+        if not has_time(deadline):
+            return None
+        # Each function is entered on its in side and left on its out side, which are joined while it is unused
+        start = (source, True)
+        parents = {start: None}
+        queue = deque([start])
+        while len(queue) != 0 and (target, False) not in parents:
+            state = queue.popleft()
+            node, out = state
+            steps = []
+            if out is True:
+                steps.extend((neighbour, False) for neighbour in get_neighbours(nxg, node))
+                if node in used:
+                    steps.append((node, False))
+            else:
+                if node not in used:
+                    steps.append((node, True))
+                steps.extend((caller, True) for caller in get_neighbours(nxg, node) if (caller, node) in flow)
+            for step in steps:
+                if step not in parents and step[0] != source:
+                    parents[step] = state
+                    queue.append(step)
+        if (target, False) not in parents:
+            break
+
+        state = (target, False)
+        while parents[state] is not None:
+            parent = parents[state]
+            if parent[0] == state[0]:
+                if parent[1] is False:
+                    used.add(state[0])
+                else:
+                    used.discard(state[0])
+            elif parent[1] is True:
+                flow.add((parent[0], state[0]))
+            else:
+                flow.discard((state[0], parent[0]))
+            state = parent
+        paths += 1
+    return paths
+
+
+# Returns the percentage of pairs of functions that are not connected. This is exact rather than sampled because two
+# functions have a nonzero connectivity exactly when they are in the same weakly connected component.
+def estimate_severity(nxg):
+    node_num = nxg.number_of_nodes()
+    if node_num < 2:
+        return Estimate(0.0, 0.0, 0.0, 0, Estimate.EXACT)
+    connected_pairs = sum(len(component) * (len(component) - 1)
+                          for component in networkx.weakly_connected_components(nxg))
+    severity = 100 - 100 * connected_pairs / (node_num * (node_num - 1))
+    return Estimate(severity, severity, severity, 0, Estimate.EXACT)
+
+
+# Estimates the node connectivity of the graph ignoring the direction of calls from randomly sampled pairs of
+# functions. The smallest number of functions calling or called by one function is an upper bound, and every sampled
+# pair can only lower it, so the estimate is the smallest one found and the interval runs down to the lowest possible
+# value. When the deadline leaves no time for sampling the bound from the degrees is returned.
+def estimate_node_connectivity(nxg, rng, samples, deadline=None, duration=0.0):
+    nodes = list(nxg)
+    if len(nodes) < 2 or not networkx.is_weakly_connected(nxg):
+        return Estimate(0, 0, 0, 0, Estimate.EXACT)
+    upper = min(len(get_neighbours(nxg, node)) for node in nodes)
+
+    def sample():
+        nonlocal upper
+        # No pair of functions has fewer than one path between them in a connected graph
+        if upper <= 1:
+            return None
+        source, target = rng.sample(nodes, 2)
+        # Adjacent functions can not be separated by removing other functions
+        if nxg.has_edge(source, target) or nxg.has_edge(target, source):
+            return math.inf
+        # Pairs with at least as many paths as the current bound can not lower it
+        paths = count_disjoint_paths(nxg, source, target, upper, deadline)
+        if paths is not None:
+            upper = min(upper, paths)
+        return paths
+    values = take_samples(sample, samples, deadline, duration)
+    return Estimate(upper, 1, upper, len(values), Estimate.BOUND)
+
+
+# Estimates the percentage of ordered pairs of functions where the first can reach the second through calls by
+# searching from randomly sampled functions
+def estimate_reachability(nxg, rng, samples, deadline=None, duration=0.0):
+    nodes = list(nxg)
+    if len(nodes) < 2:
+        return Estimate(0.0, 0.0, 0.0, 0, Estimate.EXACT)
+
+    def sample():
+        source = rng.choice(nodes)
+        return 100 * len(networkx.descendants(nxg, source) - {source}) / (len(nodes) - 1)
+    return mean_estimate(take_samples(sample, samples, deadline, duration), 0.0, 100.0)
+
+
+# Returns how much each function lies on shortest paths starting from the source using Brandes' accumulation
+def get_dependencies(nxg, source):
+    predecessors = {source: []}
+    paths = {source: 1}
+    distances = {source: 0}
+    order = []
+    queue = deque([source])
+    while len(queue) != 0:
+        node = queue.popleft()
+        order.append(node)
+        for child in nxg.successors(node):
+            if child not in distances:
+                distances[child] = distances[node] + 1
+                paths[child] = 0
+                predecessors[child] = []
+                queue.append(child)
+            if distances[child] == distances[node] + 1:
+                paths[child] += paths[node]
+                predecessors[child].append(node)
+
+    dependencies = dict.fromkeys(order, 0.0)
+    for node in reversed(order):
+        for predecessor in predecessors[node]:
+            dependencies[predecessor] += paths[predecessor] / paths[node] * (1 + dependencies[node])
+    dependencies[source] = 0.0
+    return dependencies
+
+
+# Estimates the normalized betweenness of every function from randomly sampled sources. Returns the estimates along
+# with the function with the highest betweenness and the confidence interval of its betweenness.
+def estimate_betweenness(nxg, rng, samples, deadline=None, duration=0.0):
+    nodes = list(nxg)
+    node_num = len(nodes)
+    if node_num < 3:
+        return {node: 0.0 for node in nodes}, None, Estimate(0.0, 0.0, 0.0, 0, Estimate.EXACT)
+    scale = node_num / ((node_num - 1) * (node_num - 2))
+    per_source = take_samples(lambda: get_dependencies(nxg, rng.choice(nodes)), samples, deadline, duration)
+
+    betweenness = dict.fromkeys(nodes, 0.0)
+    for dependencies in per_source:
+        for node, dependency in dependencies.items():
+            betweenness[node] += dependency * scale / len(per_source)
+    top_node = max(nodes, key=lambda node: betweenness[node])
+    top_values = [dependencies.get(top_node, 0.0) * scale for dependencies in per_source]
+    return betweenness, top_node, mean_estimate(top_values, 0.0, 1.0)
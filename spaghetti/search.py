@@ -1,27 +1,62 @@
-import ast
+import itertools
+import json
 import os
 import networkx
 
 try:
     from spaghetti.ast_parser import EdgeDetector, NodeCreator
+    from spaghetti.budget import Budget
+    from spaghetti.cache import ParseCache
+    from spaghetti.func_node import FuncNode
+    from spaghetti.loader import SourceLoader, read_source
     from spaghetti.state import Mode
 except ImportError:
     from ast_parser import EdgeDetector, NodeCreator
+    from budget import Budget
+    from cache import ParseCache
+    from func_node import FuncNode
+    from loader import SourceLoader, read_source
     from state import Mode
 
 
 # Conducts a search of given filenames or directories. Produces a Networkx functional dependency graph and associated metadata.
 class Search:
 
-    def __init__(self, filenames, inverse=False, mode=Mode.NORMAL):
+    # Version of the format graphs are saved in by save()
+    SAVE_VERSION = 3
+
+    def __init__(self, filenames, inverse=False, mode=Mode.NORMAL, cache=None, budget=None, loader=None,
+                 graph_cache=None, base=None):
         self.filenames = filenames
         self.inverse = inverse
         self.mode = mode
+        # Parsed trees may be shared with other searches so that unchanged files are not parsed again
+        self.cache = cache if cache is not None else ParseCache()
+        # Files that do not fit in the budget are skipped so that a partial graph is still produced
+        self.budget = budget if budget is not None else Budget()
+        # Reads files ahead of the parser
+        self.loader = loader if loader is not None else SourceLoader()
 
         self.tree = {}
+        self.digests = {}
+        # The functions and imports found in each file in order and the functions found in each crawled module, so
+        # that unchanged files can be added to a search of another version without parsing them again
         self.creator = {}
+        self.module_nodes = {}
+        # The search being updated by update(), if any
+        self.base = None
+        self.base_roots = []
+        # The number of nodes that were defined in files rather than made up for calls that could not be resolved
+        self.defined_num = 0
+        self.found_files = None
         self.files = []
         self.graph = {}
+        # Maps names that a call might use to the nodes they could refer to, in the order they were added
+        self.index = {}
+        # Maps each filename to the nodes defined in it
+        self.file_index = {}
+        # The part of the graph that is output when the search is focused on some functions
+        self.focus_nodes = None
         self.nxg = None
 
         self.searched_files = set()
@@ -29,13 +64,24 @@ class Search:
         self.crawled_imports = set()
         self.uncrawled = set()
         self.unsure_nodes = set()
+        # Maps files that were skipped, or only partly graphed, to the reason why
+        self.skipped = {}
 
-        # Begins main execution
-        self.crawl_files()
-        self.create_edges()
+        # Begins main execution. A graph saved in the graph cache is used instead if none of the files changed, and the
+        # graph of a base search of another version of the files is updated instead of starting over.
+        if base is not None:
+            self.update(base)
+        elif graph_cache is None or self.load(graph_cache) is False:
+            self.crawl_files()
+            self.create_edges()
+            if graph_cache is not None and self.is_partial() is False:
+                self.save(graph_cache)
 
-    # Finds the all Python files in the filenames list and calls create_nodes() to add them
-    def crawl_files(self):
+    # Finds the all Python files in the filenames list
+    def find_files(self):
+        if self.found_files is not None:
+            return self.found_files
+        found_files = []
         for filename in self.filenames:
             filename = os.path.abspath(os.path.expanduser(filename))
             if os.path.isdir(filename):
@@ -44,61 +90,336 @@ class Search:
                     for i in range(len(file[2])):
                         found_filename = file[0] + os.sep + file[2][i]
                         if found_filename[-3:] == ".py":
-                            self.create_nodes(found_filename)
+                            found_files.append(found_filename)
             else:
                 # Adds ".py" to the end of the file if that was not specified.
                 if filename[-3:] != ".py":
                     filename += ".py"
                 if os.path.isfile(filename):
                     self.searched_files.add(filename)
-                    self.create_nodes(filename)
+                    found_files.append(filename)
                 else:
                     print("Error: Could not find %s" % filename)
+        self.found_files = found_files
+        return found_files
+
+    # Finds the all Python files in the filenames list and calls create_nodes() to add them as they are loaded
+    def crawl_files(self):
+        for source in self.loader.load(self.find_files(), check=self.budget.check_file):
+            self.create_nodes(source.filename, source)
+        self.defined_num = len(self.graph)
 
-    # Creates nodes in the given file
-    def create_nodes(self, file):
-        self.tree[file] = ast.parse(open(file).read())
+    # Creates nodes in the given file. Reads the file unless its source has already been loaded.
+    def create_nodes(self, file, source=None):
+        if source is None:
+            source = read_source(file, check=self.budget.check_file)
+        # Time may have run out while the file was waiting to be parsed
+        reason = source.error or self.budget.check_exhausted()
+        if reason is None:
+            try:
+                digest, tree = self.cache.parse_source(source)
+                reason = self.budget.check_tree(tree)
+            except (SyntaxError, ValueError) as error:
+                reason = "could not be parsed: %s" % error
+        if reason is not None:
+            self.skipped[file] = reason
+            return
+        self.digests[file], self.tree[file] = digest, tree
         creator = NodeCreator(search=self, filename=file)
         creator.visit(self.tree[file])
+        self.creator[file] = creator.found
         self.files.append(file)
 
     # Creates all edges for the graph
     def create_edges(self):
         for file in self.files:
+            reason = self.budget.check_exhausted()
+            if reason is not None:
+                self.skipped[file] = "calls were not graphed because the " + reason
+                continue
             detector = EdgeDetector(search=self, filename=file)
             detector.visit(self.tree[file])
 
+    # Builds the graph by updating the graph of a search of another version of the same filenames, such as another
+    # checkout of the tree. Files are matched by their path relative to the filenames. The functions and calls of files
+    # whose contents did not change are copied in the order a full search would find them, so only the changed files
+    # are parsed. Calls in the changed files are resolved again, as are calls elsewhere to any name whose functions
+    # changed.
+    def update(self, base):
+        self.base = base
+        self.base_roots = [(os.path.abspath(os.path.expanduser(old)), os.path.abspath(os.path.expanduser(new)))
+                           for old, new in zip(base.filenames, self.filenames)]
+        rebase = self.rebase
+        copy = self.copy_node
+
+        base_files = {rebase(file): file for file in base.files if file in base.creator}
+        for file, reason in base.skipped.items():
+            if rebase(file) is None:
+                self.skipped[file] = reason
+
+        # Adds the functions in the order a full search would, crawling each import the first time it is seen
+        unchanged = set()
+        for source in self.loader.load(self.find_files(), check=self.budget.check_file):
+            old_file = base_files.get(source.filename)
+            if source.error is not None or old_file is None or base.digests[old_file] != source.digest:
+                self.create_nodes(source.filename, source)
+                continue
+            found = []
+            for event in base.creator[old_file]:
+                if isinstance(event, FuncNode):
+                    found.append(copy(event))
+                    continue
+                found.append(event)
+                kind, name = event
+                if kind == "uncrawled":
+                    self.uncrawled.add(name)
+                elif name not in self.crawled_imports:
+                    self.copy_module(name)
+            self.creator[source.filename] = found
+            self.digests[source.filename] = source.digest
+            self.files.append(source.filename)
+            unchanged.add(source.filename)
+
+        # Calls to a name only resolve differently if the functions with that name changed
+        placeholders = set(itertools.islice(base.graph, base.defined_num, None))
+        affected = set()
+        for name in set(base.index) | set(self.index):
+            old_nodes = [(rebase(node.get_path()) or node.get_path(), node.get_class(), node.is_secondary())
+                         for node in base.index.get(name, ()) if node not in placeholders]
+            new_nodes = [(node.get_path(), node.get_class(), node.is_secondary()) for node in self.index.get(name, ())]
+            if old_nodes != new_nodes:
+                affected.add(name)
+        self.defined_num = len(self.graph)
+
+        for file in self.files:
+            if file not in unchanged:
+                EdgeDetector(search=self, filename=file).visit(self.tree[file])
+                continue
+            old_file = base_files[file]
+            callers = base.file_index.get(old_file, ())
+            # A call may have used either name of a constructor, so both are resolved again
+            names = set(affected)
+            changed = True
+            while changed is True:
+                changed = False
+                for node in callers:
+                    for edge in node.get_edges(dependency=True):
+                        call_names = self.get_call_names(edge)
+                        if not call_names.isdisjoint(names) and not call_names <= names:
+                            names.update(call_names)
+                            changed = True
+            # Every call in the file is an edge, so only files with edges to the names need to be visited
+            redetect = False
+            for node in callers:
+                caller = copy(node)
+                for edge in node.get_edges(dependency=True):
+                    if not self.get_call_names(edge).isdisjoint(names):
+                        redetect = True
+                    else:
+                        dependency = copy(edge)
+                        caller.add_edge(dependency, dependency=True)
+                        dependency.add_edge(caller, dependency=False)
+                        for line in node.get_call_lines(edge):
+                            caller.add_edge(dependency, dependency=True, line=line)
+            for entry in base.unsure_nodes:
+                if entry.startswith(old_file + ":") and entry[entry.rindex("(") + 1:-1] not in names:
+                    self.unsure_nodes.add(file + entry[len(old_file):])
+            if redetect is True:
+                self.digests[file], self.tree[file] = self.cache.parse(file)
+                EdgeDetector(search=self, filename=file, names=names).visit(self.tree[file])
+        self.base = None
+
+    # Returns where a file of the base search being updated is in this search, or None if it is not in the searched
+    # files
+    def rebase(self, path):
+        for old, new in self.base_roots:
+            if path == old or path.startswith(old + os.sep):
+                return new + path[len(old):]
+        return None
+
+    # Returns the node matching a node of the base search, adding it if it is not in the graph yet
+    def copy_node(self, node):
+        path = self.rebase(node.get_path())
+        node = FuncNode(filename=node.get_path() if path is None else path, class_name=node.get_class(),
+                        name=node.get_name(), depth=1 if node.is_secondary() else 0, ast_node=node.get_ast_node(),
+                        mode=self.mode)
+        self.add_node(node)
+        return self.graph[node]
+
+    # Adds the functions of a module crawled by the base search instead of crawling it again. Returns false if there is
+    # no base search or it did not crawl the module.
+    def copy_module(self, name):
+        if self.base is None or name not in self.base.module_nodes:
+            return False
+        self.module_nodes[name] = [self.copy_node(node) for node in self.base.module_nodes[name]]
+        self.crawled_imports.add(name)
+        return True
+
+    # Returns the names that calls to the node could use
+    def get_call_names(self, node):
+        if node.get_name() == "__init__":
+            return {node.get_name(), node.get_class()}
+        return {node.get_name()}
+
+    # Adds the given node to the graph and its indexes if it is not already in it
+    def add_node(self, node):
+        if node not in self.graph:
+            self.invalidate()
+            self.graph[node] = node
+            self.index.setdefault(node.get_name(), []).append(node)
+            self.file_index.setdefault(node.get_path(), []).append(node)
+            # Constructors are called by the name of their class
+            if node.get_name() == "__init__" and node.get_class() != "__init__":
+                self.index.setdefault(node.get_class(), []).append(node)
+
+    # Returns the modification time and size of each file so that changes can be detected without reading them
+    def get_file_stats(self, files):
+        stats = {}
+        for file in files:
+            stat = os.stat(file)
+            stats[file] = [stat.st_mtime_ns, stat.st_size]
+        return stats
+
+    # Saves the graph to a file. Nodes and edges are stored as flat lists in JSON, without their syntax trees, so that
+    # loading a saved graph can never run code from it.
+    def save(self, filename):
+        nodes = list(self.graph)
+        positions = {node: i for i, node in enumerate(nodes)}
+        data = {
+            "version": self.SAVE_VERSION,
+            "filenames": [os.path.abspath(os.path.expanduser(name)) for name in self.filenames],
+            "stats": self.get_file_stats(self.files),
+            "nodes": [[node.get_path(), node.get_class(), node.get_name(), node.is_secondary()] for node in nodes],
+            "edges": [[positions[node], positions[edge], list(node.get_call_lines(edge))] for node in nodes
+                      for edge in node.get_edges(dependency=True)],
+            "files": self.files,
+            "digests": self.digests,
+            "crawled_imports": sorted(self.crawled_imports),
+            "uncrawled": sorted(self.uncrawled),
+            "unsure_nodes": sorted(self.unsure_nodes),
+        }
+        with open(filename, 'w', encoding="utf-8") as cache_file:
+            json.dump(data, cache_file)
+
+    # Loads a graph saved by save() if it was saved for the same filenames and none of the files have changed since.
+    # Returns false if the graph could not be used, including when the file is not a graph saved by save().
+    def load(self, filename):
+        try:
+            with open(filename, 'r', encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+            if data.get("version") != self.SAVE_VERSION:
+                return False
+            if data["filenames"] != [os.path.abspath(os.path.expanduser(name)) for name in self.filenames]:
+                return False
+            if self.get_file_stats(self.find_files()) != data["stats"]:
+                return False
+            # The whole graph is read before any of it is added so that a corrupt file adds nothing
+            nodes = []
+            for path, class_name, name, secondary in data["nodes"]:
+                if not all(isinstance(value, str) for value in [path, class_name, name]):
+                    raise TypeError("node names must be strings")
+                nodes.append(FuncNode(filename=path, class_name=class_name, name=name, depth=1 if secondary else 0,
+                                      mode=self.mode))
+            edges = [(nodes[caller], nodes[dependency], [int(line) for line in lines])
+                     for caller, dependency, lines in data["edges"]]
+            files = list(data["files"])
+            digests = dict(data["digests"])
+            crawled_imports, uncrawled, unsure_nodes = (set(data[key]) for key in
+                                                        ["crawled_imports", "uncrawled", "unsure_nodes"])
+        except (OSError, ValueError, AttributeError, KeyError, IndexError, TypeError):
+            return False
+
+        for node in nodes:
+            self.add_node(node)
+        for caller, dependency, lines in edges:
+            caller.add_edge(dependency, dependency=True)
+            dependency.add_edge(caller, dependency=False)
+            for line in lines:
+                caller.add_edge(dependency, dependency=True, line=line)
+        self.files = files
+        self.digests = digests
+        self.crawled_imports = crawled_imports
+        self.uncrawled = uncrawled
+        self.unsure_nodes = unsure_nodes
+        return True
+
+    # Returns the graph, or only the focused part of it if the search is focused
     def get_graph(self):
+        if self.focus_nodes is not None:
+            return self.focus_nodes
         return self.graph
 
+    # Focuses the search on the functions within radius calls, in either direction, of the functions with the given
+    # names so that only that part of the graph is output. A name may be a function or class name or Class.function.
+    # Calls are followed from every matched function, but not through other functions outside the primary search
+    # area. Returns the functions that matched.
+    def focus(self, names, radius=1):
+        matched = []
+        for name in names:
+            class_name, separator, function_name = name.rpartition(".")
+            for node in self.index.get(function_name, ()):
+                if (separator == "" or node.get_class() == class_name) and node not in matched:
+                    matched.append(node)
+
+        nodes = set(matched)
+        frontier = matched
+        for i in range(radius):
+            next_frontier = []
+            for node in frontier:
+                if node.is_secondary() is True and i != 0:
+                    continue
+                for edge in itertools.chain(node.get_edges(), node.get_edges(dependency=True)):
+                    if edge not in nodes:
+                        nodes.add(edge)
+                        next_frontier.append(edge)
+            frontier = next_frontier
+
+        self.focus_nodes = {node: node for node in self.graph if node in nodes}
+        self.invalidate()
+        return matched
+
+    # Returns true if part of the search area was left out of the graph
+    def is_partial(self):
+        return len(self.skipped) != 0
+
     # Gets a networkx representation of the graph. Does not include nodes that are not from the primary search area
-    # so that the measurement is more precise.
-    def get_nx_graph(self):
-        if self.nxg is not None:
-            return self.nxg
-        else:
+    # so that the measurement is more precise. The graph is built once in bulk and kept until the search graph changes.
+    # Edges go from each function to its dependents, or to its dependencies when inverse. The other direction is a
+    # read-only view of the same graph so that both directions never need to be in memory at once.
+    def get_nx_graph(self, inverse=None):
+        if inverse is None:
+            inverse = self.inverse
+        if self.nxg is None:
+            primary = [node for node in self.get_graph() if node.is_secondary() is False]
+            primary_set = set(primary)
+            # Edges are weighted by the number of places the caller calls the function from
+            edges = [(node, edge, {"weight": edge.get_weight(node)}) for node in primary for edge in node.get_edges()
+                     if edge in primary_set]
             nxg = networkx.DiGraph()
-            for node in self.graph:
-                if node.is_secondary() is False:
-                    nxg.add_node(node)
-            for node in self.graph:
-                if node.is_secondary() is False:
-                    for edge in node.get_edges():
-                        if edge.is_secondary() is False:
-                            if self.inverse is False:
-                                nxg.add_edge(node, edge)
-                            else:
-                                nxg.add_edge(edge, node)
+            nxg.add_nodes_from(primary)
+            nxg.add_edges_from(edges)
+            # Only edges that were traced at runtime carry the number of calls
+            for node in primary:
+                for edge, calls in node.get_traced_calls().items():
+                    if edge in primary_set:
+                        nxg.edges[edge, node]["calls"] = calls
             self.nxg = nxg
-            return nxg
+        if inverse is True:
+            return self.nxg.reverse(copy=False)
+        return self.nxg
+
+    # Discards the networkx graph so that it is rebuilt with any changes to the search graph
+    def invalidate(self):
+        self.nxg = None
 
     # Returns a textual representation of the graph
-    def get_graph_str(self, indent=0):
+    def get_graph_str(self, indent=""):
         # Prints each line of the data.
         graph_str = ""
+        graph = self.get_graph()
         format_string = "%" + indent + "s %" + indent + "s\n"
-        for node in sorted(self.graph, key=lambda the_node: the_node.get_string()):
+        for node in sorted(graph, key=lambda the_node: the_node.get_string()):
             if node.is_hidden() is False:
-                graph_str += format_string % (node, node.get_edges_str(dependency=self.inverse))
+                graph_str += format_string % (node, node.get_edges_str(dependency=self.inverse, nodes=graph))
         return graph_str
 
@@ -0,0 +1,89 @@
+from unittest import TestCase
+import unittest
+import os
+import tempfile
+
+from spaghetti.affected import find_affected_tests, get_test_id, is_test_file
+from spaghetti.search import Search
+
+
+class AffectedTestsTest(TestCase):
+    core = "def helper():\n    pass\n\n\ndef wrapper():\n    helper()\n\n\ndef other():\n    pass\n"
+    tests = ("class CoreTest:\n    def setUp(self):\n        helper()\n\n    def test_setup(self):\n        pass\n\n\n"
+             "def test_wrapper():\n    wrapper()\n\n\ndef test_other():\n    other()\n")
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        os.mkdir("tests")
+        with open("core.py", "w") as module:
+            module.write(self.core)
+        with open(os.path.join("tests", "check_core.py"), "w") as module:
+            module.write(self.tests)
+        self.search = Search(filenames=["."])
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_transitive_callers_and_fixtures(self):
+        tests = find_affected_tests(self.search, ["core.py"])
+        self.assertEqual([get_test_id(test) for test in tests],
+                         ["tests/check_core.py::test_other", "tests/check_core.py::test_wrapper",
+                          "tests/check_core.py::CoreTest::test_setup"])
+
+    def test_unittest_ids(self):
+        self.search = Search(filenames=["core.py", os.path.join("tests", "check_core.py")])
+        tests = find_affected_tests(self.search, ["core.py"])
+        self.assertIn("tests.check_core.CoreTest.test_setup", [get_test_id(test, "unittest") for test in tests])
+
+    def test_unrelated_file_has_no_tests(self):
+        with open("unrelated.py", "w") as module:
+            module.write("def unrelated():\n    pass\n")
+        self.search = Search(filenames=["."])
+        self.assertEqual(find_affected_tests(self.search, ["unrelated.py"]), [])
+
+    def test_test_files(self):
+        self.assertTrue(is_test_file(os.path.join("spaghetti", "tests", "search_tests.py")))
+        self.assertTrue(is_test_file("test_search.py"))
+        self.assertFalse(is_test_file(os.path.join("spaghetti", "search.py")))
+
+    def test_tests_directory_above_search_area_ignored(self):
+        project = os.path.join(self.directory.name, "tests", "project")
+        os.mkdir(project)
+        with open(os.path.join(project, "lib.py"), "w") as module:
+            module.write("def testify():\n    pass\n")
+        os.chdir(project)
+        self.assertEqual(find_affected_tests(Search(filenames=["."]), ["lib.py"]), [])
+        # The search area is outside the working directory
+        os.chdir(self.cwd)
+        search = Search(filenames=[project])
+        self.assertEqual(find_affected_tests(search, [os.path.join(project, "lib.py")]), [])
+
+    def test_graph_cache_reused(self):
+        Search(filenames=["."], graph_cache="graph.cache")
+        search = Search(filenames=["."], graph_cache="graph.cache")
+        self.assertEqual(search.tree, {})
+        self.assertEqual(len(find_affected_tests(search, ["core.py"])), 3)
+
+    def test_corrupt_graph_cache_is_a_miss(self):
+        for content in [b"\x80\x04K\x01.", b"[1, 2]", b'{"version": 3, "filenames": 1}', b"\xff\xfe"]:
+            with open("graph.cache", "wb") as cache_file:
+                cache_file.write(content)
+            search = Search(filenames=["."], graph_cache="graph.cache")
+            self.assertNotEqual(search.tree, {})
+            self.assertEqual(len(find_affected_tests(search, ["core.py"])), 3)
+
+    def test_graph_cache_invalidated_by_change(self):
+        Search(filenames=["."], graph_cache="graph.cache")
+        with open("core.py", "a") as module:
+            module.write("\n\ndef added():\n    pass\n")
+        search = Search(filenames=["."], graph_cache="graph.cache")
+        self.assertNotEqual(search.tree, {})
+        self.assertIn("added", search.index)
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
@@ -0,0 +1,91 @@
+from unittest import TestCase
+import unittest
+import json
+import os
+import tempfile
+
+from spaghetti.batch import Batch
+
+
+class BatchTest(TestCase):
+    manifest = """workers = 2
+max_memory = 4096
+
+[[project]]
+name = "first"
+paths = ["first"]
+formats = ["text", "json"]
+
+[[project]]
+name = "second"
+paths = ["second"]
+formats = ["measurements"]
+approx = true
+"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for project in ["first", "second"]:
+            os.mkdir(os.path.join(self.directory.name, project))
+            with open(os.path.join(self.directory.name, project, "module.py"), "w") as module:
+                module.write("def a():\n    b()\n\n\ndef b():\n    pass\n")
+        self.manifest_file = os.path.join(self.directory.name, "manifest.toml")
+        with open(self.manifest_file, "w") as manifest:
+            manifest.write(self.manifest)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_writes_separate_outputs(self):
+        results = Batch(self.manifest_file).run()
+        output = os.path.join(self.directory.name, "spaghetti-batch")
+        self.assertEqual(sorted(os.listdir(output)), ["first.json", "first.txt", "second.measurements.json"])
+        self.assertEqual(len(results["first"]), 2)
+
+    def test_json_output_has_edges(self):
+        Batch(self.manifest_file).run()
+        with open(os.path.join(self.directory.name, "spaghetti-batch", "first.json")) as json_file:
+            graph = json.load(json_file)
+        self.assertEqual(len(graph["edges"]), 1)
+
+    def test_estimates_kept_separate(self):
+        Batch(self.manifest_file).run()
+        with open(os.path.join(self.directory.name, "spaghetti-batch", "second.measurements.json")) as json_file:
+            measurements = json.load(json_file)
+        self.assertIsInstance(measurements["node_connectivity"], (int, float))
+        self.assertIn("node_connectivity", measurements["estimates"])
+
+    def test_memory_share_gives_partial_graph(self):
+        results = Batch(self.manifest_file, workers=1, max_memory=1).run()
+        self.assertIn(os.path.join(self.directory.name, "spaghetti-batch", "first.skipped.json"), results["first"])
+
+    def test_unsafe_name_is_value_error(self):
+        for name in ["../outside", "a/b", ".."]:
+            with open(self.manifest_file, "w") as manifest:
+                manifest.write('[[project]]\nname = "%s"\npaths = ["first"]\n' % name)
+            self.assertRaises(ValueError, Batch, self.manifest_file)
+
+    def test_workers_overridden(self):
+        self.assertEqual(Batch(self.manifest_file, workers=1).workers, 1)
+
+    def test_invalid_workers_is_value_error(self):
+        self.assertRaises(ValueError, Batch, self.manifest_file, workers=0)
+        for workers in ["0", "2.5", "true"]:
+            with open(self.manifest_file, "w") as manifest:
+                manifest.write('workers = %s\n[[project]]\nname = "first"\npaths = ["first"]\n' % workers)
+            self.assertRaises(ValueError, Batch, self.manifest_file)
+
+    def test_paths_must_be_list(self):
+        with open(self.manifest_file, "w") as manifest:
+            manifest.write('[[project]]\nname = "first"\npaths = "first"\n')
+        self.assertRaises(ValueError, Batch, self.manifest_file)
+
+    def test_unknown_format_is_value_error(self):
+        with open(self.manifest_file, "w") as manifest:
+            manifest.write('[[project]]\nname = "first"\npaths = ["first"]\nformats = ["xml"]\n')
+        self.assertRaises(ValueError, Batch, self.manifest_file)
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
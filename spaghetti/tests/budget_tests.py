@@ -0,0 +1,61 @@
+from unittest import TestCase
+import unittest
+import os
+import tempfile
+
+from spaghetti.budget import Budget
+from spaghetti.search import Search
+
+
+class BudgetTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.small = os.path.join(self.directory.name, "small.py")
+        self.large = os.path.join(self.directory.name, "large.py")
+        self.broken = os.path.join(self.directory.name, "broken.py")
+        with open(self.small, "w") as module:
+            module.write("def a():\n    b()\n\n\ndef b():\n    pass\n")
+        with open(self.large, "w") as module:
+            for i in range(200):
+                module.write("def f%d():\n    a()\n\n\n" % i)
+        with open(self.broken, "w") as module:
+            module.write("def (:\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unlimited_budget_skips_only_broken_files(self):
+        search = Search(filenames=[self.directory.name])
+        self.assertEqual(list(search.skipped), [self.broken])
+
+    def test_large_file_skipped(self):
+        search = Search(filenames=[self.directory.name], budget=Budget(max_file_size=1))
+        self.assertIn(self.large, search.skipped)
+        self.assertTrue(search.is_partial())
+        self.assertEqual(search.files, [self.small])
+
+    def test_unreadable_file_skipped_with_size_limit(self):
+        dangling = os.path.join(self.directory.name, "dangling.py")
+        os.symlink(os.path.join(self.directory.name, "missing.py"), dangling)
+        search = Search(filenames=[self.directory.name], budget=Budget(max_file_size=1))
+        self.assertIn("could not be read", search.skipped[dangling])
+        self.assertEqual(search.files, [self.small])
+
+    def test_ast_node_limit(self):
+        search = Search(filenames=[self.directory.name], budget=Budget(max_ast_nodes=100))
+        self.assertIn(self.large, search.skipped)
+        self.assertNotIn(self.small, search.skipped)
+
+    def test_exhausted_time_budget_returns_partial_graph(self):
+        search = Search(filenames=[self.directory.name], budget=Budget(time_budget=0))
+        self.assertEqual(len(search.skipped), 3)
+        self.assertEqual(len(search.graph), 0)
+
+    def test_memory_limit(self):
+        self.assertIsNotNone(Budget(max_memory=0).check_exhausted())
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
@@ -1,6 +1,8 @@
 from unittest import TestCase
 import unittest
 import io
+import os
+import subprocess
 import sys
 
 import spaghetti.command_line as cmd
@@ -28,6 +30,40 @@ class CommandLineTest(TestCase):
         args = cmd.get_input(self.name)
         self.assertEqual(args.mode, Mode.NORMAL)
 
+    def test_unmatched_focus_exits_nonzero(self):
+        directory = os.path.dirname(os.path.abspath(__file__))
+        old_argv = sys.argv
+        sys.argv = ["spaghetti", os.path.join(directory, "func_node_tests.py"), "--focus", "no_such_function"]
+        sys.stdout = io.StringIO()
+        try:
+            with self.assertRaises(SystemExit) as context:
+                cmd.main()
+        finally:
+            sys.stdout = sys.__stdout__
+            sys.argv = old_argv
+        self.assertEqual(context.exception.code, 2)
+
+    def test_focus_without_primary_functions_exits_nonzero(self):
+        directory = os.path.dirname(os.path.abspath(__file__))
+        old_argv = sys.argv
+        sys.argv = ["spaghetti", os.path.join(directory, "func_node_tests.py"), "--focus", "assertEqual", "--radius",
+                    "0", "--measurements"]
+        sys.stdout = output = io.StringIO()
+        try:
+            with self.assertRaises(SystemExit) as context:
+                cmd.main()
+        finally:
+            sys.stdout = sys.__stdout__
+            sys.argv = old_argv
+        self.assertEqual(context.exception.code, 2)
+        self.assertIn("No function in the search area", output.getvalue())
+
+    def test_scipy_not_imported_at_startup(self):
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        code = "import sys, spaghetti.command_line; print('scipy' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+        self.assertEqual(output.strip(), b"False")
+
 
 if __name__ == '__main__':
     # begin the unittest.main()
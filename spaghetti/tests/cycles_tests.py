@@ -0,0 +1,41 @@
+from unittest import TestCase
+import unittest
+import networkx
+
+from spaghetti.cycles import CycleReport, strongly_connected_components
+
+
+class CyclesTest(TestCase):
+
+    def setUp(self):
+        self.graph = networkx.DiGraph()
+        self.graph.add_edges_from([(1, 2), (2, 3), (3, 1), (3, 4), (4, 5), (5, 5), (6, 4)])
+        self.report = CycleReport(self.graph)
+
+    def test_matches_networkx(self):
+        components = strongly_connected_components(self.graph, self.graph.successors)
+        expected = networkx.strongly_connected_components(self.graph)
+        self.assertEqual(sorted(map(sorted, components)), sorted(map(sorted, expected)))
+
+    def test_cycle_found(self):
+        self.assertEqual(self.report.cycle_num, 1)
+        self.assertEqual(sorted(self.report.components[0]), [1, 2, 3])
+
+    def test_self_call_is_cycle_of_one(self):
+        self.assertIn([5], CycleReport(self.graph, min_size=1).components)
+
+    def test_condensation_depth(self):
+        self.assertEqual(self.report.depth, 3)
+
+    def test_deep_graph_does_not_recurse(self):
+        graph = networkx.DiGraph()
+        networkx.add_path(graph, range(100000))
+        graph.add_edge(99999, 0)
+        report = CycleReport(graph)
+        self.assertEqual(report.largest_cycle, 100000)
+        self.assertEqual(report.depth, 1)
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
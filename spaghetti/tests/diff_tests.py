@@ -0,0 +1,79 @@
+from unittest import TestCase
+import unittest
+import os
+import tempfile
+
+from spaghetti.diff import diff_sources
+from spaghetti.search import Search
+
+
+class DiffTest(TestCase):
+    old_source = "def a():\n    b()\n\n\ndef b():\n    pass\n\n\ndef c():\n    pass\n"
+    new_source = "def a():\n    b()\n    d()\n    missing()\n\n\ndef b():\n    return 1\n\n\ndef d():\n    pass\n"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.old = os.path.join(self.directory.name, "old")
+        self.new = os.path.join(self.directory.name, "new")
+        for root, source in [(self.old, self.old_source), (self.new, self.new_source)]:
+            os.mkdir(root)
+            with open(os.path.join(root, "module.py"), "w") as module:
+                module.write(source)
+            with open(os.path.join(root, "unchanged.py"), "w") as module:
+                module.write("import json\n\n\ndef e():\n    b()\n    c()\n    json.dumps()\n")
+        self.diff = diff_sources(self.old, self.new)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_added_function(self):
+        self.assertIn("module.py:.d", self.diff.added)
+
+    def test_removed_function(self):
+        self.assertIn("module.py:.c", self.diff.removed)
+
+    def test_changed_function(self):
+        self.assertEqual(self.diff.changed, ["module.py:.a", "module.py:.b"])
+
+    def test_new_edge(self):
+        self.assertIn(("module.py:.a", "module.py:.d"), self.diff.new_edges)
+
+    def test_fan_out_change(self):
+        self.assertEqual(self.diff.degrees["module.py:.a"], ((0, 1), (0, 2)))
+
+    def test_only_changed_files_reported(self):
+        self.assertEqual(self.diff.changed_files, ["module.py"])
+
+    def test_functions_outside_tree_left_out(self):
+        self.assertEqual(self.diff.added, ["module.py:.d"])
+        for key in self.diff.degrees:
+            self.assertTrue(key.startswith("module.py") or key.startswith("unchanged.py"))
+
+    def test_calls_to_removed_functions_resolved_again(self):
+        self.assertIn(("unchanged.py:.e", "module.py:.c"), self.diff.dropped_edges)
+
+    def test_update_matches_full_search(self):
+        old_search = Search(filenames=[self.old])
+        updated = Search(filenames=[self.new], base=old_search)
+        full = Search(filenames=[self.new])
+        self.assertEqual(self.get_edges(updated), self.get_edges(full))
+        # The unchanged file has calls to a removed function so it is parsed again, but no other file is
+        self.assertEqual(sorted(os.path.basename(file) for file in updated.tree), ["module.py", "unchanged.py"])
+
+    def test_unchanged_files_not_parsed(self):
+        old_search = Search(filenames=[self.new])
+        updated = Search(filenames=[self.new], base=old_search)
+        self.assertEqual(updated.tree, {})
+        self.assertEqual(self.get_edges(updated), self.get_edges(old_search))
+
+    def get_edges(self, search):
+        return {(repr(node), repr(edge), tuple(node.get_call_lines(edge)))
+                for node in search.graph for edge in node.get_edges(dependency=True)}
+
+    def test_identical_trees_are_empty(self):
+        self.assertTrue(diff_sources(self.old, self.old).is_empty())
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
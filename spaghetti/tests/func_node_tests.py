@@ -23,6 +23,13 @@ class FuncNodeTest(TestCase):
     def test_edge_in_edges_str(self):
         self.assertIn(self.name, self.node2.get_edges_str(dependency=True))
 
+    def test_weight_counts_call_sites(self):
+        self.assertEqual(self.node2.get_weight(self.node), 1)
+        self.node2.add_edge(self.node, dependency=True, line=3)
+        self.node2.add_edge(self.node, dependency=True, line=7)
+        self.assertEqual(self.node2.get_weight(self.node), 2)
+        self.assertEqual(list(self.node2.get_call_lines(self.node)), [3, 7])
+
     def test_node_equal(self):
         self.assertEqual(self.node, self.node_equal)
 
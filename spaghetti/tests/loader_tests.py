@@ -0,0 +1,64 @@
+from unittest import TestCase
+import unittest
+import codecs
+import os
+import tempfile
+
+from spaghetti.loader import SourceLoader, read_source
+
+
+class LoaderTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filenames = []
+        for i in range(20):
+            self.filenames.append(self.write("module%d.py" % i, b"def f():\n    pass\n"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, data):
+        filename = os.path.join(self.directory.name, name)
+        with open(filename, "wb") as module:
+            module.write(data)
+        return filename
+
+    def test_order_is_preserved(self):
+        sources = list(SourceLoader(workers=4, prefetch=3).load(self.filenames))
+        self.assertEqual([source.filename for source in sources], self.filenames)
+
+    def test_declared_encoding(self):
+        filename = self.write("latin.py", "# -*- coding: latin-1 -*-\nname = 'café'\n".encode("latin-1"))
+        source = read_source(filename)
+        self.assertEqual(source.encoding, "iso-8859-1")
+        self.assertIn("café", source.text)
+
+    def test_byte_order_mark_removed(self):
+        source = read_source(self.write("bom.py", codecs.BOM_UTF8 + b"x = 1\n"))
+        self.assertEqual(source.text, "x = 1\n")
+
+    def test_large_files_are_memory_mapped(self):
+        mapped = read_source(self.filenames[0], mmap_size=1)
+        self.assertEqual(mapped.text, "def f():\n    pass\n")
+        self.assertEqual(mapped.digest, read_source(self.filenames[0]).digest)
+
+    def test_memory_mapped_encoding(self):
+        filename = self.write("latin.py", "# -*- coding: latin-1 -*-\nname = 'café'\n".encode("latin-1"))
+        self.assertIn("café", read_source(filename, mmap_size=1).text)
+        source = read_source(self.write("bom.py", codecs.BOM_UTF8 + b"x = 1\n"), mmap_size=1)
+        self.assertEqual(source.text, "x = 1\n")
+
+    def test_invalid_encoding_is_error(self):
+        source = read_source(self.write("broken.py", b"x = '\xff'\n"))
+        self.assertIsNotNone(source.error)
+
+    def test_check_skips_reading(self):
+        sources = list(SourceLoader().load(self.filenames[:2], check=lambda filename: "skipped"))
+        self.assertEqual([source.error for source in sources], ["skipped", "skipped"])
+        self.assertIsNone(sources[0].text)
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
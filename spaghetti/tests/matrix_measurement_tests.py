@@ -0,0 +1,65 @@
+from unittest import TestCase
+import unittest
+
+from spaghetti.func_node import FuncNode
+from spaghetti.matrix_measurements import MatrixMeasurements, numpy
+
+
+# Connects a caller to the function it calls
+def add_call(caller, dependency):
+    caller.add_edge(dependency, dependency=True)
+    dependency.add_edge(caller)
+
+
+@unittest.skipIf(numpy is None, "numpy and scipy are not installed")
+class MatrixMeasurementsTest(TestCase):
+
+    def setUp(self):
+        self.a = FuncNode(filename="a.py", name="a")
+        self.b = FuncNode(filename="a.py", name="b")
+        self.c = FuncNode(filename="c.py", name="c")
+        self.d = FuncNode(filename="d.py", name="d")
+        self.unknown = FuncNode(filename="Unknown", name="unknown", depth=1)
+        add_call(self.a, self.b)
+        add_call(self.a, self.c)
+        add_call(self.b, self.c)
+        add_call(self.b, self.unknown)
+        graph = {node: node for node in [self.a, self.b, self.c, self.d, self.unknown]}
+        self.measure = MatrixMeasurements(graph)
+
+    def test_secondary_nodes_excluded(self):
+        self.assertEqual(self.measure.node_num, 4)
+
+    def test_fan_in_and_out(self):
+        self.assertEqual(self.measure.fan_in.tolist(), [0, 1, 2, 0])
+        self.assertEqual(self.measure.fan_out.tolist(), [2, 1, 0, 0])
+
+    def test_call_sites_weight_matrix(self):
+        self.a.add_edge(self.b, dependency=True, line=4)
+        self.a.add_edge(self.b, dependency=True, line=5)
+        measure = MatrixMeasurements({node: node for node in [self.a, self.b, self.c, self.d]})
+        self.assertEqual(measure.matrix[0, 1], 2)
+        self.assertEqual(measure.calls_out.tolist(), [3, 1, 0, 0])
+        self.assertEqual(measure.calls_in.tolist(), [0, 2, 2, 0])
+        self.assertEqual(measure.fan_out.tolist(), [2, 1, 0, 0])
+
+    def test_severity(self):
+        # Only d is isolated so 6 of the 12 ordered pairs are not connected
+        self.assertAlmostEqual(self.measure.severity, 50.0)
+
+    def test_most_depended_upon_is_first_hotspot(self):
+        self.assertEqual(self.measure.get_hotspots(1)[0][0], self.c)
+
+    def test_pagerank_sums_to_one(self):
+        self.assertAlmostEqual(float(self.measure.pagerank.sum()), 1.0)
+
+    def test_coupling(self):
+        self.assertEqual(self.measure.modules, ["a.py", "c.py", "d.py"])
+        self.assertEqual(self.measure.afferent.tolist(), [0, 2, 0])
+        self.assertEqual(self.measure.efferent.tolist(), [2, 0, 0])
+        self.assertEqual(self.measure.instability.tolist(), [1.0, 0.0, 0.0])
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
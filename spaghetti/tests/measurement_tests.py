@@ -1,8 +1,10 @@
 from unittest import TestCase
 import unittest
 import networkx
+from networkx.algorithms.connectivity import local_node_connectivity
 
 from spaghetti.measurements import Measurements
+from spaghetti.sampling import count_disjoint_paths
 
 
 class CommandLineTest(TestCase):
@@ -28,6 +30,61 @@ class CommandLineTest(TestCase):
         self.assertGreaterEqual(self.measure.node_connectivity, 0)
 
 
+class ApproximateMeasurementTest(TestCase):
+
+    def setUp(self):
+        self.graph = networkx.gnp_random_graph(40, 0.1, seed=1, directed=True)
+        self.exact = Measurements(self.graph)
+        self.measure = Measurements(self.graph, approx=True, samples=400, seed=1)
+
+    def test_severity_matches_exact(self):
+        self.assertAlmostEqual(self.measure.severity, self.exact.severity)
+
+    def test_connectivity_is_upper_bound(self):
+        self.assertGreaterEqual(self.measure.node_connectivity, self.exact.node_connectivity)
+
+    def test_kinds_labelled(self):
+        self.assertEqual(self.measure.estimates["severity"].kind, "exact")
+        self.assertNotIn("CI", repr(self.measure.estimates["severity"]))
+        self.assertIn(self.measure.estimates["node_connectivity"].kind, ["bound", "exact"])
+        self.assertEqual(self.measure.estimates["reachability"].kind, "interval")
+
+    def test_reachability_interval(self):
+        estimate = self.measure.estimates["reachability"]
+        reachable = sum(len(networkx.descendants(self.graph, node)) for node in self.graph)
+        self.assertLessEqual(estimate.low, estimate.value)
+        self.assertLessEqual(estimate.value, estimate.high)
+        self.assertAlmostEqual(estimate.value, 100 * reachable / (40 * 39), delta=10)
+
+    def test_betweenness_close_to_exact(self):
+        exact = networkx.betweenness_centrality(self.graph)
+        self.assertAlmostEqual(self.measure.betweenness[self.measure.max_betweenness_node],
+                               exact[self.measure.max_betweenness_node], delta=0.05)
+
+    def test_time_budget_limits_samples(self):
+        measure = Measurements(self.graph, approx=True, samples=10 ** 9, time_budget=0.3, seed=1)
+        self.assertLess(measure.estimates["reachability"].samples, 10 ** 9)
+
+    def test_exhausted_time_budget_takes_no_samples(self):
+        measure = Measurements(self.graph, approx=True, time_budget=0, seed=1)
+        self.assertEqual(measure.estimates["reachability"].samples, 0)
+        self.assertEqual(measure.estimates["node_connectivity"].samples, 0)
+        self.assertGreaterEqual(measure.node_connectivity, self.exact.node_connectivity)
+
+    def test_few_samples_have_no_interval(self):
+        measure = Measurements(self.graph, approx=True, samples=2, seed=1)
+        estimate = measure.estimates["reachability"]
+        self.assertEqual((estimate.low, estimate.high), (0.0, 100.0))
+        self.assertIn("too few for a CI", repr(estimate))
+
+    def test_disjoint_paths_match_local_connectivity(self):
+        undirected = self.graph.to_undirected()
+        for source, target in [(0, 5), (3, 17), (12, 30), (8, 39)]:
+            if not undirected.has_edge(source, target):
+                self.assertEqual(count_disjoint_paths(self.graph, source, target, 40),
+                                 local_node_connectivity(undirected, source, target))
+
+
 if __name__ == '__main__':
     # begin the unittest.main()
     unittest.main()
@@ -0,0 +1,86 @@
+from unittest import TestCase
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+
+from spaghetti.command_line import run_check
+from spaghetti.rules import DegreeRule, ForbiddenRule, RuleSet
+from spaghetti.search import Search
+
+
+class RulesTest(TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        for package in ["api", "db"]:
+            os.mkdir(package)
+        with open(os.path.join("api", "views.py"), "w") as module:
+            module.write("def view():\n    query()\n    render()\n\n\ndef render():\n    pass\n")
+        with open(os.path.join("db", "models.py"), "w") as module:
+            module.write("def query():\n    pass\n")
+        self.search = Search(filenames=["."])
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_forbidden_call_found(self):
+        violations = RuleSet([ForbiddenRule("layers", "api/*", "db/*")]).check(self.search)
+        self.assertEqual(len(violations), 1)
+        self.assertIn("query", violations[0])
+
+    def test_allowed_call_not_reported(self):
+        self.assertEqual(RuleSet([ForbiddenRule("layers", "db/*", "api/*")]).check(self.search), [])
+
+    def test_fan_out_limit(self):
+        violations = RuleSet([DegreeRule("fan-out", "*", max_fan_out=1)]).check(self.search)
+        self.assertEqual(len(violations), 1)
+        self.assertIn("view", violations[0])
+
+    def test_stops_at_max_violations(self):
+        rules = RuleSet([DegreeRule("fan-in", "*", max_fan_in=0), DegreeRule("fan-out", "*", max_fan_out=0)])
+        self.assertEqual(len(rules.check(self.search, max_violations=2)), 2)
+
+    def test_load_from_toml(self):
+        with open("rules.toml", "w") as rules_file:
+            rules_file.write('max_violations = 5\n\n[[forbid]]\nfrom = "api/*"\nto = "db/*"\n')
+        rules = RuleSet.load("rules.toml")
+        self.assertEqual(rules.max_violations, 5)
+        self.assertEqual(len(rules.check(self.search)), 1)
+
+    def test_missing_key_is_value_error(self):
+        with open("rules.toml", "w") as rules_file:
+            rules_file.write('[[forbid]]\nfrom = "api/*"\n')
+        self.assertRaises(ValueError, RuleSet.load, "rules.toml")
+
+    def test_rule_not_table_is_value_error(self):
+        with open("rules.toml", "w") as rules_file:
+            rules_file.write('forbid = ["x"]\n')
+        self.assertRaises(ValueError, RuleSet.load, "rules.toml")
+
+    def test_no_max_violations_is_value_error(self):
+        with open("rules.toml", "w") as rules_file:
+            rules_file.write('max_violations = 0\n')
+        self.assertRaises(ValueError, RuleSet.load, "rules.toml")
+        self.assertRaises(ValueError, RuleSet([]).check, self.search, max_violations=0)
+
+    def test_check_reuses_graph_cache(self):
+        with open("rules.toml", "w") as rules_file:
+            rules_file.write('[[forbid]]\nfrom = "api/*"\nto = "db/*"\n')
+        outputs = []
+        for i in range(2):
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                self.assertEqual(run_check(["--rules", "rules.toml", "--graph-cache", "graph.cache"]), 1)
+            outputs.append(output.getvalue())
+            self.assertTrue(os.path.exists("graph.cache"))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn("query", outputs[1])
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
@@ -0,0 +1,91 @@
+from unittest import TestCase
+import unittest
+import os
+import tempfile
+import networkx
+
+from spaghetti.search import Search
+
+
+class SearchTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.directory.name, "module.py"), "w") as module:
+            module.write("def a():\n    b()\n    b()\n    print()\n\n\ndef b():\n    pass\n\n\n"
+                         "class C:\n    def c(self):\n        a()\n\n\ndef d():\n    print()\n")
+        self.search = Search(filenames=[self.directory.name])
+        self.a = self.search.index["a"][0]
+        self.b = self.search.index["b"][0]
+        self.c = self.search.index["c"][0]
+        self.d = self.search.index["d"][0]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_edges_go_to_dependents(self):
+        self.assertEqual(set(self.search.get_nx_graph().edges()), {(self.b, self.a), (self.a, self.c)})
+
+    def test_inverse_is_view_of_same_graph(self):
+        inverse = self.search.get_nx_graph(inverse=True)
+        self.assertEqual(set(inverse.edges()), {(self.a, self.b), (self.c, self.a)})
+        self.assertIsInstance(inverse, networkx.DiGraph)
+        self.assertIs(self.search.get_nx_graph(), self.search.nxg)
+
+    def test_secondary_nodes_excluded(self):
+        self.assertEqual(self.search.get_nx_graph().number_of_nodes(), 5)
+
+    def test_cached_until_invalidated(self):
+        nxg = self.search.get_nx_graph()
+        self.assertIs(self.search.get_nx_graph(), nxg)
+        self.search.invalidate()
+        self.assertIsNot(self.search.get_nx_graph(), nxg)
+
+    def test_edges_use_nodes_in_graph(self):
+        for node in self.search.graph:
+            for edge in node.get_edges() | node.get_edges(dependency=True):
+                self.assertIs(self.search.graph[edge], edge)
+
+    def test_call_sites_weight_edges(self):
+        nxg = self.search.get_nx_graph()
+        self.assertEqual(nxg.edges[self.b, self.a]["weight"], 2)
+        self.assertEqual(nxg.edges[self.a, self.c]["weight"], 1)
+        self.assertEqual(list(self.a.get_call_lines(self.b)), [2, 3])
+
+    def test_call_sites_saved(self):
+        filename = os.path.join(self.directory.name, "graph.cache")
+        self.search.save(filename)
+        loaded = Search(filenames=[self.directory.name], graph_cache=filename)
+        # The graph was loaded rather than parsed again
+        self.assertEqual(len(loaded.tree), 0)
+        a = loaded.index["a"][0]
+        self.assertEqual(list(a.get_call_lines(loaded.index["b"][0])), [2, 3])
+
+    def test_focus_radius(self):
+        self.assertEqual(self.search.focus(["b"], radius=1), [self.b])
+        self.assertEqual(set(self.search.get_graph()), {self.a, self.b})
+        self.search.focus(["b"], radius=2)
+        self.assertIn(self.c, self.search.get_graph())
+
+    def test_focus_by_class(self):
+        self.assertEqual(self.search.focus(["C.c"]), [self.c])
+
+    def test_focus_does_not_follow_builtins(self):
+        self.search.focus(["a"], radius=3)
+        self.assertNotIn(self.d, self.search.get_graph())
+
+    def test_focus_on_builtin_includes_callers(self):
+        self.search.focus(["print"], radius=1)
+        self.assertEqual(set(self.search.get_nx_graph()), {self.a, self.d})
+        self.search.focus(["print"], radius=2)
+        self.assertIn(self.c, self.search.get_graph())
+
+    def test_focused_output(self):
+        self.search.focus(["c"], radius=1)
+        self.assertEqual(self.search.get_nx_graph().number_of_nodes(), 2)
+        self.assertNotIn("b", self.search.get_graph_str())
+
+
+if __name__ == '__main__':
+    # begin the unittest.main()
+    unittest.main()
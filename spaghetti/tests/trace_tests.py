@@ -0,0 +1,84 @@
+from unittest import TestCase
+import unittest
+import os
+import tempfile
+
+from spaghetti.search import Search
+from spaghetti.tracing import CallTracer, get_names, merge_calls
+
+
+class Shape:
+    def area(self):
+        def scale():
+            return 1
+        return scale()
+
+
+class TraceTest(TestCase):
+    # The call to helper through getattr cannot be found by static analysis
+    script = ("import sys\n\n\ndef helper():\n    return 1\n\n\ndef loop():\n    for i in range(3):\n"
+              "        getattr(sys.modules[__name__], 'helper')()\n\n\nloop()\nsys.exit(3)\n")
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        with open("script.py", "w") as module:
+            module.write(self.script)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_get_names(self):
+        self.assertEqual(get_names(Shape.area.__code__)[1], "area")
+        if hasattr(Shape.area.__code__, "co_qualname"):
+            self.assertEqual(get_names(Shape.area.__code__), ("Shape", "area"))
+            scale = next(const for const in Shape.area.__code__.co_consts if hasattr(const, "co_name"))
+            self.assertEqual(get_names(scale), ("Shape", "scale"))
+
+    def test_run_returns_status(self):
+        tracer = CallTracer()
+        self.assertEqual(tracer.run(["python", "script.py"]), 3)
+        counts = {(caller.co_name, callee.co_name): count for (caller, callee), count in tracer.calls.items()}
+        self.assertEqual(counts[("loop", "helper")], 3)
+        self.assertEqual(counts[("<module>", "loop")], 1)
+
+    def test_resumed_generators_not_counted(self):
+        with open("generator.py", "w") as module:
+            module.write("def numbers():\n    yield 1\n    yield 2\n    yield 3\n\n\ndef total():\n"
+                         "    return sum(numbers())\n\n\ntotal()\n")
+        for use_monitoring in [False, True]:
+            tracer = CallTracer(files=["generator.py"])
+            tracer.use_monitoring = use_monitoring and tracer.use_monitoring
+            tracer.run(["generator.py"])
+            counts = {(caller.co_name, callee.co_name): count for (caller, callee), count in tracer.calls.items()
+                      if caller.co_filename.endswith("generator.py")}
+            self.assertEqual(counts, {("<module>", "total"): 1, ("total", "numbers"): 1})
+
+    def test_merge_adds_weighted_edges(self):
+        search = Search(filenames=["script.py"])
+        tracer = CallTracer()
+        tracer.run(["script.py"])
+        added = merge_calls(search, tracer.calls)
+        self.assertEqual([(caller.get_name(), callee.get_name()) for caller, callee in added], [("loop", "helper")])
+        nxg = search.get_nx_graph()
+        helper = next(node for node in nxg if node.get_name() == "helper")
+        loop = next(node for node in nxg if node.get_name() == "loop")
+        self.assertEqual(nxg.edges[helper, loop]["calls"], 3)
+        self.assertEqual(loop.get_calls(helper), 3)
+
+    def test_merge_ignores_crawled_imports(self):
+        # The functions textwrap.fill calls are all in textwrap, which is crawled but not graphed
+        with open("use.py", "w") as module:
+            module.write("import textwrap\n\n\ndef use():\n    return textwrap.fill('a b c', width=2)\n\n\nuse()\n")
+        search = Search(filenames=["use.py"])
+        self.assertIn("textwrap", search.crawled_imports)
+        tracer = CallTracer()
+        tracer.run(["use.py"])
+        self.assertEqual(merge_calls(search, tracer.calls), [])
+        self.assertEqual([node for node in search.graph if node.is_secondary() and node.get_traced_calls()], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import dis
+import inspect
+import os
+import runpy
+import sys
+import threading
+
+
+# Code flags of functions whose frames are suspended and resumed
+RESUMABLE = inspect.CO_GENERATOR | inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR
+
+# sys.monitoring is only available from Python 3.12
+monitoring = getattr(sys, "monitoring", None)
+
+
+# Records how many times each function calls each other function while code runs. Calls are counted in a single
+# table keyed by the code objects of the caller and the callee, so the work done on each call is kept small. With
+# files, only calls to functions in those files are counted.
+#
+# sys.monitoring is used where it is available since it only reports Python function calls, and calls to functions
+# that are not wanted stop being reported after the first. Otherwise sys.setprofile is used.
+class CallTracer:
+
+    def __init__(self, files=None):
+        self.calls = {}
+        self.files = None if files is None else {os.path.abspath(file) for file in files}
+        # Whether calls to each code object are counted
+        self.wanted = {}
+        # The instruction offset each generator or coroutine starts at, to tell a call from a resumption
+        self.starts = {}
+        self.use_monitoring = monitoring is not None
+
+    def is_wanted(self, code):
+        if code not in self.wanted:
+            self.wanted[code] = self.files is None or os.path.abspath(code.co_filename) in self.files
+        return self.wanted[code]
+
+    # Returns the offset a frame of the generator or coroutine has when it is first called
+    def get_start(self, code):
+        if code not in self.starts:
+            self.starts[code] = -1
+            # From Python 3.11 frames start at their first RESUME instruction rather than before the first instruction
+            for instruction in dis.get_instructions(code):
+                if instruction.opname == "RESUME":
+                    self.starts[code] = instruction.offset
+                    break
+        return self.starts[code]
+
+    def profile(self, frame, event, arg):
+        if event == "call":
+            code = frame.f_code
+            caller = frame.f_back
+            if caller is None or self.is_wanted(code) is False:
+                return
+            # Resuming a generator or coroutine is reported as a call as well
+            if code.co_flags & RESUMABLE and frame.f_lasti != self.get_start(code):
+                return
+            key = (caller.f_code, code)
+            self.calls[key] = self.calls.get(key, 0) + 1
+
+    # Called by sys.monitoring when a Python function starts, but not when a generator or coroutine resumes
+    def start_function(self, code, offset):
+        if self.is_wanted(code) is False:
+            return monitoring.DISABLE
+        # The frame of the function that started
+        caller = sys._getframe(1).f_back
+        if caller is not None:
+            key = (caller.f_code, code)
+            self.calls[key] = self.calls.get(key, 0) + 1
+
+    def start(self):
+        if self.use_monitoring is True:
+            try:
+                monitoring.use_tool_id(monitoring.PROFILER_ID, "spaghetti")
+            except ValueError:
+                # Another profiler is already using sys.monitoring
+                self.use_monitoring = False
+        if self.use_monitoring is True:
+            monitoring.restart_events()
+            monitoring.register_callback(monitoring.PROFILER_ID, monitoring.events.PY_START, self.start_function)
+            monitoring.set_events(monitoring.PROFILER_ID, monitoring.events.PY_START)
+        else:
+            threading.setprofile(self.profile)
+            sys.setprofile(self.profile)
+
+    def stop(self):
+        if self.use_monitoring is True:
+            monitoring.set_events(monitoring.PROFILER_ID, 0)
+            monitoring.register_callback(monitoring.PROFILER_ID, monitoring.events.PY_START, None)
+            monitoring.free_tool_id(monitoring.PROFILER_ID)
+        else:
+            sys.setprofile(None)
+            threading.setprofile(None)
+
+    # Runs a Python command, such as ["python", "-m", "pytest"] or ["script.py", "--option"], in this process while
+    # tracing it and returns its exit status
+    def run(self, command):
+        if len(command) != 0 and os.path.basename(command[0]).startswith("python"):
+            command = command[1:]
+        if len(command) == 0:
+            raise ValueError("no command to trace")
+
+        old_argv = sys.argv
+        old_path = list(sys.path)
+        status = 0
+        self.start()
+        try:
+            if command[0] == "-m":
+                if len(command) < 2:
+                    raise ValueError("no module to trace")
+                sys.argv = command[1:]
+                sys.path.insert(0, os.getcwd())
+                runpy.run_module(command[1], run_name="__main__", alter_sys=True)
+            else:
+                sys.argv = command
+                sys.path.insert(0, os.path.dirname(os.path.abspath(command[0])))
+                runpy.run_path(command[0], run_name="__main__")
+        except SystemExit as exit:
+            if exit.code is None:
+                status = 0
+            elif isinstance(exit.code, int):
+                status = exit.code
+            else:
+                status = 1
+        finally:
+            self.stop()
+            sys.argv = old_argv
+            sys.path[:] = old_path
+        return status
+
+
+# Returns the class and function names the graph would use for the code object. The class is None if it is unknown.
+def get_names(code):
+    if code.co_name == "<module>":
+        return "", "__main__"
+    # Before Python 3.11 the class is not known
+    if not hasattr(code, "co_qualname"):
+        return None, code.co_name
+    # Nested functions are named after the innermost class and function they are in, as they are when the AST is parsed
+    parts = code.co_qualname.split(".")
+    class_name = ""
+    for i, part in enumerate(parts[:-1]):
+        if part != "<locals>" and parts[i + 1] != "<locals>":
+            class_name = part
+    return class_name, parts[-1]
+
+
+# Adds the traced calls between functions in the graph of the search as edges weighted by how many times they were
+# made. Calls to or from functions that are not in the graph, or are outside the primary search area, are ignored.
+# Returns the calls that were not already edges in the graph as pairs of caller and callee.
+def merge_calls(search, calls):
+    nodes = {}
+
+    def find_node(code):
+        if code not in nodes:
+            nodes[code] = None
+            class_name, name = get_names(code)
+            for node in search.file_index.get(os.path.abspath(code.co_filename), ()):
+                if node.is_secondary() is True:
+                    continue
+                if node.get_name() == name and (class_name is None or node.get_class() == class_name):
+                    nodes[code] = node
+                    break
+        return nodes[code]
+
+    added = []
+    for (caller_code, callee_code), count in calls.items():
+        caller = find_node(caller_code)
+        callee = find_node(callee_code)
+        if caller is None or callee is None:
+            continue
+        if callee not in caller.get_edges(dependency=True):
+            added.append((caller, callee))
+            caller.add_edge(callee, dependency=True)
+            callee.add_edge(caller, dependency=False)
+        caller.add_calls(callee, count)
+    search.invalidate()
+    return added